@@ -0,0 +1,44 @@
+"""
+Time Chinese word lookups on a mix of Simplified and Traditional text.
+
+Traditional-to-Simplified conversion happens while tokenizing, so this is a
+way to see how much that conversion costs. Run it before and after a change
+to compare.
+"""
+
+import timeit
+
+import wordfreq
+from wordfreq.chinese import simplify_chinese
+from wordfreq.tokens import lossy_tokenize
+
+
+TEXTS = [
+    # Simplified
+    "他是历史上第六位在任期内去世的美国副总统。",
+    "今天天气很好，我们去公园散步吧。",
+    # Traditional
+    "他是歷史上第六位在任期內去世的美國副總統。",
+    "我們在網路上看到很多關於這個問題的新聞。",
+    # Mixed, plus some Latin text
+    "這個 app 的设计很漂亮，下載了 10 次。",
+    "台灣的髮型設計師和大陆的发型设计师",
+]
+NUMBER = 500
+REPEAT = 7
+
+
+def bench(name, func):
+    for text in TEXTS:
+        func(text)
+    elapsed = min(
+        timeit.repeat(lambda: [func(text) for text in TEXTS], number=NUMBER, repeat=REPEAT)
+    )
+    per_call = elapsed / NUMBER / len(TEXTS) * 1e6
+    print("{:<20}{:>8.1f} µs per text".format(name, per_call))
+
+
+if __name__ == "__main__":
+    bench("simplify_chinese", simplify_chinese)
+    bench("lossy_tokenize", lambda text: lossy_tokenize(text, "zh"))
+    bench("word_frequency", lambda text: wordfreq._word_frequency(text, "zh", "best", 0.0))
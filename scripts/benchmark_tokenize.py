@@ -0,0 +1,42 @@
+"""
+Time tokenization and lookups of short texts in languages that use the regex
+tokenizer. Run it before and after a change to compare.
+"""
+
+import timeit
+
+import wordfreq
+from wordfreq.tokens import simple_tokenize, tokenize
+
+TEXTS = {
+    "en": ["the", "The", "don't", "frequency", "The quick brown fox jumps over the lazy dog."],
+    "de": ["und", "Straße", "Ich habe heute keine Zeit für dich, aber morgen vielleicht."],
+    "es": ["de", "año", "¿Dónde está la biblioteca?", "tod@s l@s niñ@s"],
+    "fr": ["de", "l'heure", "Qu'est-ce que c'est ?", "Aujourd'hui, j'ai mangé une crêpe."],
+    "ru": ["в", "Москва", "Я не знаю, что сказать."],
+    "ar": ["في", "كَلِمَة"],
+    "hi": ["के", "हिन्दी भाषा"],
+}
+NUMBER = 2000
+REPEAT = 5
+
+
+def bench(name, func):
+    for lang, texts in TEXTS.items():
+        for text in texts:
+            func(text, lang)
+        elapsed = min(
+            timeit.repeat(
+                lambda: [func(text, lang) for text in texts],  # noqa: B023
+                number=NUMBER,
+                repeat=REPEAT,
+            )
+        )
+        per_call = elapsed / NUMBER / len(texts) * 1e6
+        print(f"{name:<20}{lang:<4}{per_call:>8.2f} µs per text")
+
+
+if __name__ == "__main__":
+    bench("simple_tokenize", lambda text, lang: simple_tokenize(text))
+    bench("tokenize", tokenize)
+    bench("word_frequency", lambda text, lang: wordfreq._word_frequency(text, lang, "best", 0.0))
@@ -0,0 +1,20 @@
+"""
+Build the index of every language's wordlist that
+`frequencies_across_languages` and `score_languages` use, and save it in
+wordfreq's cache directory. This does the same thing as
+`wordfreq build-index`, for running from a checkout of wordfreq.
+
+    python scripts/make_combined_index.py [wordlist]
+"""
+
+import sys
+
+from wordfreq import save_combined_index
+
+
+def build(wordlist="best"):
+    print(save_combined_index(wordlist))
+
+
+if __name__ == "__main__":
+    build(*sys.argv[1:2])
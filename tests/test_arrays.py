@@ -0,0 +1,45 @@
+import itertools
+
+import pytest
+from wordfreq import get_cB_dict, get_frequency_array, iter_wordlist, write_frequency_table
+
+
+def test_numpy_array():
+    np = pytest.importorskip("numpy")
+    words, cBs = get_frequency_array("fr", "small")
+    assert words.dtype == object
+    assert cBs.dtype == np.int16
+    assert cBs.flags["C_CONTIGUOUS"]
+    assert list(words[:10]) == list(itertools.islice(iter_wordlist("fr", "small"), 10))
+    cB_dict = get_cB_dict("fr", "small")
+    assert len(words) == len(cB_dict)
+    assert cBs.tolist() == [cB_dict[word] for word in words]
+
+
+def test_arrow_array():
+    pa = pytest.importorskip("pyarrow")
+    words, cBs = get_frequency_array("fr", "small", library="arrow")
+    assert words.type == pa.string()
+    assert cBs.type == pa.int16()
+    np_words, np_cBs = get_frequency_array("fr", "small")
+    assert words.to_pylist() == list(np_words)
+    assert cBs.to_pylist() == np_cBs.tolist()
+
+
+def test_unknown_library():
+    with pytest.raises(ValueError):
+        get_frequency_array("fr", "small", library="polars")
+
+
+@pytest.mark.parametrize("suffix", [".parquet", ".arrow"])
+def test_write_frequency_table(tmp_path, suffix):
+    pytest.importorskip("pyarrow")
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+
+    path = str(tmp_path / f"fr{suffix}")
+    write_frequency_table(path, "fr", "small")
+    table = pq.read_table(path) if suffix == ".parquet" else feather.read_table(path)
+    assert table.column_names == ["word", "cB"]
+    assert table.column("word")[0].as_py() == "de"
+    assert table.column("cB").to_pylist() == list(get_cB_dict("fr", "small").values())
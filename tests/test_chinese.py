@@ -1,5 +1,6 @@
 import pytest
-from wordfreq import tokenize, word_frequency, zipf_frequency
+from wordfreq import lossy_tokenize, tokenize, word_frequency, zipf_frequency
+from wordfreq.chinese import has_traditional, simplify_chinese
 
 
 def test_tokens():
@@ -78,6 +79,18 @@ def test_tokens():
     assert simp_lengths == trad_lengths
 
 
+def test_lossy_simplification():
+    # lossy_tokenize gets Simplified Chinese tokens straight from the
+    # tokenizer, which must match simplifying each token on its own
+    mixed = "他是歷史上第六位在任期内去世的美國副总统。Hello 世界"
+    tokens = tokenize(mixed, "zh")
+    assert lossy_tokenize(mixed, "zh") == [simplify_chinese(token) for token in tokens]
+
+    assert has_traditional("歷史")
+    assert not has_traditional("历史 history")
+    assert simplify_chinese("歷史 History") == "历史 history"
+
+
 def test_combination():
     xiexie_freq = word_frequency("谢谢", "zh")  # "Thanks"
     assert word_frequency("谢谢谢谢", "zh") == pytest.approx(xiexie_freq / 20, rel=0.01)
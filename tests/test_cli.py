@@ -0,0 +1,86 @@
+import io
+import json
+import subprocess
+import sys
+
+import pytest
+from wordfreq import word_frequency, zipf_frequency
+from wordfreq.cli import make_parser
+
+
+def run(argv, text):
+    args = make_parser().parse_args(argv)
+    outfile = io.StringIO()
+    args.func(args, io.StringIO(text), outfile)
+    return outfile.getvalue()
+
+
+def test_annotate_tsv():
+    output = run(
+        ["annotate", "-l", "en", "-c", "word", "--header"],
+        "id\tword\n1\tthe\n2\tFrequency\n3\n",
+    )
+    assert output.splitlines() == [
+        "id\tword\tzipf",
+        "1\tthe\t7.73",
+        f"2\tFrequency\t{zipf_frequency('Frequency', 'en')}",
+        "3\t",
+    ]
+
+
+def test_annotate_csv():
+    output = run(["annotate", "-l", "fr", "-f", "csv", "-c", "2", "-s", "cB"], 'x,"de la"\n')
+    assert output == "x,de la,-176\n"
+
+
+def test_annotate_jsonl():
+    output = run(
+        ["annotate", "-l", "es", "-f", "jsonl", "-c", "text", "-s", "freq", "-o", "f"],
+        '{"text": "hola"}\n{"other": 1}\n',
+    )
+    records = [json.loads(line) for line in output.splitlines()]
+    assert records == [
+        {"text": "hola", "f": word_frequency("hola", "es")},
+        {"other": 1, "f": None},
+    ]
+
+
+def test_annotate_errors():
+    with pytest.raises(SystemExit, match="start at 1"):
+        run(["annotate", "-l", "en", "-c", "0"], "a\tthe\n")
+    with pytest.raises(SystemExit, match="Line 3 isn't a JSON object"):
+        run(["annotate", "-l", "en", "-f", "jsonl", "-c", "w"], '{"w": "a"}\n\n["the"]\n')
+    with pytest.raises(SystemExit, match="Line 1 isn't valid JSON"):
+        run(["annotate", "-l", "en", "-f", "jsonl", "-c", "w"], "{oops\n")
+
+
+def test_tokenize():
+    output = run(["tokenize", "-l", "en", "-s", "cB"], "Hello, world!\n\nIt's 2022.\n")
+    # Each line's tokens are followed by an empty line, even if it has none
+    assert output == "hello\t-428\nworld\t-311\n\n\nit's\t-267\n2022\t-429\n\n"
+
+
+def test_dump():
+    assert run(["dump", "-l", "en", "-n", "3"], "") == "the\t7.73\nto\t7.43\nand\t7.41\n"
+    assert run(["dump", "-l", "en", "-n", "0"], "") == ""
+    with pytest.raises(SystemExit):
+        make_parser().parse_args(["dump", "-l", "en", "-n", "-2"])
+    with pytest.raises(SystemExit):
+        make_parser().parse_args(["annotate", "-l", "en", "-j", "-1"])
+
+
+def test_command_with_jobs():
+    lines = [f"{i}\tword {i}" for i in range(50)]
+    result = subprocess.run(
+        [sys.executable, "-m", "wordfreq.cli", "annotate", "-l", "en", "-c", "2", "-j", "2"]
+        + ["--batch-size", "7"],
+        input="\n".join(lines) + "\n",
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    output = result.stdout.splitlines()
+    assert len(output) == 50
+    for line, annotated in zip(lines, output):
+        word = line.split("\t")[1]
+        assert annotated == f"{line}\t{zipf_frequency(word, 'en')}"
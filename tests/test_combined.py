@@ -0,0 +1,100 @@
+import pytest
+import wordfreq
+from wordfreq import (
+    available_languages,
+    frequencies_across_languages,
+    read_cBpack,
+    token_frequency,
+)
+from wordfreq.combined import CombinedIndex
+
+LANGUAGES = ["de", "en", "fr"]
+
+
+@pytest.fixture(scope="module")
+def index():
+    return CombinedIndex.build(_packs(LANGUAGES))
+
+
+def test_build():
+    packs = [
+        ("en", [[], [], ["the"], ["of", "and"], ["naïve"]]),
+        ("fr", [[], ["de"], ["la", "the"], [], ["naïve", "la"]]),
+    ]
+    index = CombinedIndex.build(packs)
+    assert index.languages == ["en", "fr"]
+    assert len(index) == 6
+    assert index.lookup("the") == [("en", 2), ("fr", 2)]
+    assert index.lookup("naïve") == [("en", 4), ("fr", 4)]
+    assert index.lookup("de") == [("fr", 1)]
+    # A word that appears twice in a list gets the band it appears in last,
+    # as it does in `get_frequency_dict`
+    assert index.lookup("la") == [("fr", 4)]
+    assert index.lookup("naive") == []
+    assert index.lookup("") == []
+    assert index.lookup("zzz") == []
+
+
+def test_lookup_every_word(index):
+    # Check words on both sides of the boundaries between blocks of keys
+    pack = read_cBpack(available_languages("small")["fr"])
+    for band, bucket in enumerate(pack):
+        for word in bucket[::7]:
+            assert ("fr", band) in index.lookup(word)
+            assert index.lookup(word + "\x00") == []
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("WORDFREQ_CACHE_DIR", str(tmp_path))
+    wordfreq.get_combined_index.cache_clear()
+    yield tmp_path
+    wordfreq.get_combined_index.cache_clear()
+
+
+def test_get_combined_index(index, cache_dir):
+    with pytest.raises(FileNotFoundError, match="wordfreq build-index --wordlist small"):
+        wordfreq.get_combined_index("small")
+
+    # An index built from the installed wordlists is loaded
+    path = cache_dir / "combined_small.msgpack.gz"
+    source = wordfreq._wordlist_source("small")
+    CombinedIndex.build(_packs(["en", "fr"]), source).save(str(path))
+    wordfreq.get_combined_index.cache_clear()
+    loaded = wordfreq.get_combined_index("small")
+    assert loaded.languages == ["en", "fr"]
+    assert loaded.source == source
+
+    # An index built from other wordlists is rejected
+    CombinedIndex.build(_packs(["en"]), "0123456789abcdef").save(str(path))
+    wordfreq.get_combined_index.cache_clear()
+    with pytest.raises(ValueError, match="different 'small' wordlists"):
+        wordfreq.get_combined_index("small")
+
+
+def _packs(languages):
+    available = available_languages("small")
+    return [(lang, read_cBpack(available[lang])) for lang in languages]
+
+
+def test_save_and_load(index, tmp_path):
+    path = tmp_path / "combined.msgpack.gz"
+    index.save(str(path))
+    loaded = CombinedIndex.load(str(path))
+    assert loaded.languages == LANGUAGES
+    assert len(loaded) == len(index)
+    for word in ["the", "die", "le", "naïve", "2022", "xyzzyx"]:
+        assert loaded.lookup(word) == index.lookup(word)
+
+
+def test_frequencies_across_languages(index, monkeypatch):
+    monkeypatch.setattr(wordfreq, "get_combined_index", lambda wordlist: index)
+    for token in ["the", "die", "le", "pizza", "2022", "100,000", "xyzzyx"]:
+        expected = {
+            lang: token_frequency(token, lang, "small")
+            for lang in LANGUAGES
+            if token_frequency(token, lang, "small") > 0
+        }
+        assert frequencies_across_languages(token, "small") == expected
+
+    assert frequencies_across_languages("xyzzyx", "small") == {}
@@ -0,0 +1,140 @@
+import multiprocessing
+import sqlite3
+import threading
+
+import pytest
+import wordfreq
+from wordfreq import disable_disk_cache, enable_disk_cache, lossy_tokenize, word_frequency
+from wordfreq.diskcache import DiskCache
+
+
+@pytest.fixture
+def fresh_caches():
+    # Make sure lookups actually reach the disk cache
+    wordfreq._token_cache.clear()
+    yield
+    disable_disk_cache()
+    wordfreq._token_cache.clear()
+
+
+def test_disk_cache(tmp_path, fresh_caches):
+    path = tmp_path / "tokens.sqlite"
+    phrase = "谢谢你的帮助"
+    expected = word_frequency(phrase, "zh")
+    wordfreq._token_cache.clear()
+
+    enable_disk_cache(path)
+    assert word_frequency(phrase, "zh") == expected
+    # Latin text isn't slow enough to be worth caching on disk
+    word_frequency("thank you for your help", "en")
+    disable_disk_cache()
+
+    cache = DiskCache(path)
+    assert cache.get(phrase, "zh") == tuple(lossy_tokenize(phrase, "zh"))
+    assert cache.get("thank you for your help", "en") is None
+    assert len(cache) == 1
+
+    # Tokens stored by a different version aren't used
+    assert DiskCache(path, version="other").get(phrase, "zh") is None
+
+    # Tokens on disk are used without tokenizing the text again
+    wordfreq._token_cache.clear()
+    enable_disk_cache(path).put("一个不存在的短语", "zh", ("的",))
+    assert word_frequency("一个不存在的短语", "zh") == word_frequency("的", "zh")
+
+
+def test_disk_cache_processes(tmp_path):
+    # Processes can share a cache file, including one that was opened before
+    # they were forked
+    cache = DiskCache(tmp_path / "tokens.sqlite")
+    cache.put("parent", "ko", ("parent",))
+    cache.flush()
+    context = multiprocessing.get_context("fork")
+    workers = [
+        context.Process(target=_put_and_flush, args=(cache, f"child {i}")) for i in range(4)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+        assert worker.exitcode == 0
+    assert len(cache) == 5
+    assert cache.get("child 3", "ko") == ("child 3",)
+    cache.close()
+
+
+def _put_and_flush(cache, text):
+    assert cache.get("parent", "ko") == ("parent",)
+    cache.put(text, "ko", (text,))
+    cache.flush()
+
+
+def test_disk_cache_fork_while_locked(tmp_path):
+    # A fork while another thread holds the cache's lock doesn't leave the
+    # child unable to use the cache
+    cache = DiskCache(tmp_path / "tokens.sqlite")
+    cache.put("parent", "ko", ("parent",))
+    cache.flush()
+    locked = threading.Event()
+    release = threading.Event()
+
+    def hold_lock():
+        with cache._lock:
+            locked.set()
+            release.wait()
+
+    holder = threading.Thread(target=hold_lock)
+    holder.start()
+    locked.wait()
+    try:
+        worker = multiprocessing.get_context("fork").Process(
+            target=_put_and_flush, args=(cache, "child")
+        )
+        worker.start()
+        worker.join(timeout=30)
+        if worker.is_alive():
+            worker.kill()
+        assert worker.exitcode == 0
+    finally:
+        release.set()
+        holder.join()
+    assert cache.get("child", "ko") == ("child",)
+    cache.close()
+
+
+def test_disk_cache_count(tmp_path):
+    # Storing an entry again replaces it without counting it twice
+    cache = DiskCache(tmp_path / "tokens.sqlite")
+    for tokens in [("a",), ("b",), ("b",)]:
+        cache.put("text", "zh", tokens)
+        cache.put("other", "zh", tokens)
+        cache.flush()
+    assert cache._count == len(cache) == 2
+    assert cache.get("text", "zh") == ("b",)
+    cache.close()
+
+
+def test_disk_cache_eviction(tmp_path):
+    cache = DiskCache(tmp_path / "tokens.sqlite", max_entries=100)
+    for i in range(1000):
+        cache.put(f"text {i}", "ja", (str(i),))
+    cache.flush()
+    assert len(cache) <= 100
+    # The most recent entries are kept
+    assert cache.get("text 999", "ja") == ("999",)
+    assert cache.get("text 0", "ja") is None
+    cache.close()
+
+
+def test_disk_cache_snapshot(tmp_path, fresh_caches):
+    cache = DiskCache(tmp_path / "original.sqlite")
+    cache.put("おはようございます", "ja", ("おはよう", "ござい", "ます"))
+    cache.snapshot(tmp_path / "snapshot.sqlite")
+    cache.close()
+
+    warmed = enable_disk_cache(tmp_path / "warmed.sqlite", snapshot=tmp_path / "snapshot.sqlite")
+    assert warmed.get("おはようございます", "ja") == ("おはよう", "ござい", "ます")
+
+    # The snapshot is a plain SQLite file
+    with sqlite3.connect(tmp_path / "snapshot.sqlite") as conn:
+        assert conn.execute("SELECT COUNT(*) FROM tokens").fetchone()[0] == 1
@@ -0,0 +1,76 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+# This runs in a separate process, so that freezing its objects doesn't
+# affect the rest of the tests
+MEASURE = r"""
+import gc, itertools, multiprocessing, sys
+import wordfreq
+
+def memory(*fields):
+    # Add up some fields of the process's memory usage, in kB
+    total = 0
+    with open("/proc/self/smaps_rollup") as smaps:
+        for line in smaps:
+            name, *values = line.split()
+            if name.rstrip(":") in fields:
+                total += int(values[0])
+    return total
+
+def shared():
+    return memory("Shared_Clean", "Shared_Dirty")
+
+def child(conn, blob):
+    # Look up strings that the child made itself, like a server would
+    words = blob.decode("utf-8").split("\n")
+    # Memory that stops being shared has been copied into this process
+    before = shared()
+    for word in words:
+        wordfreq.word_frequency(word, "en")
+        wordfreq.token_frequency(word, "en")
+    gc.collect()
+    conn.send(before - shared())
+
+start = memory("Rss")
+if sys.argv[1] == "prepare":
+    wordfreq.prepare_for_fork(["en"])
+else:
+    wordfreq.get_cB_dict("en")
+    wordfreq._surface_form_table("en", "best")
+loaded = memory("Rss") - start
+words = itertools.chain.from_iterable(wordfreq.get_frequency_list("en"))
+blob = "\n".join(itertools.islice(words, 0, None, 10)).encode("utf-8")
+
+context = multiprocessing.get_context("fork")
+receiver, sender = context.Pipe()
+process = context.Process(target=child, args=(sender, blob))
+process.start()
+print(loaded, receiver.recv())
+process.join()
+"""
+
+
+def measure(mode):
+    result = subprocess.run(
+        [sys.executable, "-c", MEASURE, mode], capture_output=True, text=True, check=True
+    )
+    loaded, copied = map(int, result.stdout.split())
+    return loaded, copied
+
+
+@pytest.mark.skipif(
+    not Path("/proc/self/smaps_rollup").exists(),
+    reason="measuring shared memory requires Linux",
+)
+def test_prepare_for_fork():
+    loaded, copied = measure("prepare")
+    _loaded, copied_without = measure("plain")
+    # A worker that looks up words and collects garbage keeps sharing most of
+    # the memory that the wordlist takes up, and much more than it would
+    # without `prepare_for_fork`. (Some pages get copied anyway, when new
+    # objects are allocated in the space left in them.)
+    assert copied < loaded * 0.2
+    assert copied < copied_without / 2
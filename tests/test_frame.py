@@ -0,0 +1,56 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+
+from wordfreq import word_frequency, zipf_frequency
+from wordfreq.frame import frequency_column, zipf_column
+
+WORDS = ["the", "de", "The", None, "esquivalience", "the", "la", "de"]
+LANGS = ["en", "fr", "en", "en", "en", "fr", None, "en"]
+
+
+def expected(func, words, langs):
+    return np.array(
+        [
+            np.nan if word is None or lang is None else func(word, lang)
+            for word, lang in zip(words, langs)
+        ],
+        dtype=np.float32,
+    )
+
+
+def test_zipf_column():
+    series = pd.Series(WORDS)
+    result = zipf_column(series, "en")
+    assert result.dtype == np.float32
+    np.testing.assert_array_equal(result, expected(zipf_frequency, WORDS, ["en"] * len(WORDS)))
+
+    result = zipf_column(series, pd.Series(LANGS))
+    np.testing.assert_array_equal(result, expected(zipf_frequency, WORDS, LANGS))
+
+
+def test_frequency_column():
+    result = frequency_column(WORDS, LANGS)
+    np.testing.assert_array_equal(result, expected(word_frequency, WORDS, LANGS))
+
+
+def test_arrow_column():
+    pa = pytest.importorskip("pyarrow")
+    words = pa.chunked_array([WORDS[:3], WORDS[3:]])
+    result = zipf_column(words, pa.array(LANGS))
+    np.testing.assert_array_equal(result, expected(zipf_frequency, WORDS, LANGS))
+
+
+def test_parallel(monkeypatch):
+    monkeypatch.setattr("wordfreq.frame.CHUNK_SIZE", 3)
+    words = ["word", "frequency", "table", "column", "language", "the", "of"] * 3
+    langs = ["en", "fr", "de"] * 7
+    result = zipf_column(words, langs, jobs=2)
+    np.testing.assert_array_equal(result, expected(zipf_frequency, words, langs))
+
+
+def test_mismatched_lengths():
+    with pytest.raises(ValueError):
+        zipf_column(WORDS, LANGS[:-1])
+    assert len(zipf_column([], "en")) == 0
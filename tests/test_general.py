@@ -1,14 +1,45 @@
+import collections
+import itertools
+import random
+import re
+import sys
+import threading
+
 import pytest
+import wordfreq
 from wordfreq import (
     available_languages,
     cB_to_freq,
+    cB_to_zipf,
+    complete,
+    get_cB_dict,
+    get_frequency_dict,
+    iter_wordlist,
     lossy_tokenize,
+    match_pattern,
     random_ascii_words,
     random_words,
+    sample,
+    score_languages,
+    set_frequency_cutoff,
+    sort_by_frequency,
+    suggest,
+    token_cB,
+    token_cBs,
+    token_frequencies,
+    token_frequency,
     tokenize,
     top_n_list,
+    word_cB,
+    word_cBs,
     word_frequency,
+    word_rank,
+    words_in_range,
+    zipf_frequency,
 )
+from wordfreq.combined import CombinedIndex
+from wordfreq.numbers import has_digit_sequence
+from wordfreq.tokens import _tokenizer_family
 
 
 def test_freq_examples():
@@ -19,6 +50,36 @@ def test_freq_examples():
     assert word_frequency("infrequency", "en") > 0.0
 
 
+def test_token_frequency():
+    for token in ["the", "infrequency", "can't", "2022", "802.11n", "esquivalience"]:
+        assert token_frequency(token, "en") == word_frequency(token, "en")
+        assert token_frequency(token, "en", strict=True) == word_frequency(token, "en")
+    assert token_frequency("esquivalience", "en", minimum=1e-6) == 1e-6
+
+    tokens = ["de", "la", "año", "xyzzyx"]
+    assert token_frequencies(tokens, "es") == [word_frequency(token, "es") for token in tokens]
+
+    # Tokens that aren't normalized aren't found, unless you ask to check them
+    assert token_frequency("The", "en") == 0.0
+    with pytest.raises(ValueError):
+        token_frequency("The", "en", strict=True)
+    with pytest.raises(ValueError):
+        token_frequencies(["the", "can’t"], "en", strict=True)
+
+
+def test_surface_forms():
+    # Common forms of common words are precomputed, and must give the same
+    # results as looking them up the long way
+    for word in ["the", "The", "THE", "don't", "don’t", "Don’t", "I"]:
+        expected = token_frequency(lossy_tokenize(word, "en")[0], "en")
+        assert word_frequency(word, "en") == expected
+        assert word_frequency(word, "en", minimum=0.5) == 0.5
+
+    # Turkish upper-cases "i" as "İ", so "I" is not a form of "i"
+    assert word_frequency("I", "tr") == word_frequency("ı", "tr")
+    assert word_frequency("İ", "tr") == word_frequency("i", "tr")
+
+
 def test_languages():
     # Make sure we get all the languages when looking for the default
     # 'best' wordlist
@@ -55,6 +116,270 @@ def test_minimums():
     assert word_frequency("the", "en", minimum=1) == 1
 
 
+def test_minimum_after_cache():
+    # The cache doesn't depend on `minimum`, so asking for the same phrase
+    # with different minimums must still apply each one
+    phrase = "frequency infrequency"
+    freq = word_frequency(phrase, "en")
+    assert 0 < freq < 1e-5
+    assert word_frequency(phrase, "en", minimum=1e-5) == 1e-5
+    assert word_frequency(phrase, "en", minimum=1e-9) == freq
+    assert word_frequency(phrase, "en") == freq
+    assert zipf_frequency(phrase, "en", minimum=6) == 6
+    assert word_frequency("esquivalience frequency", "en", minimum=1e-6) == 1e-6
+    assert word_frequency("esquivalience frequency", "en") == 0
+
+
+def test_cB_functions():
+    assert get_cB_dict("en")["the"] == -127
+    assert cB_to_freq(get_cB_dict("en")["the"]) == get_frequency_dict("en")["the"]
+    assert word_cB("The", "en") == token_cB("the", "en") == -127
+
+    # The integer results are exactly what the Zipf scale rounds to
+    words = list(itertools.islice(iter_wordlist("fr"), 0, None, 10)) + [
+        "l'amour",
+        "2022",
+        "de la",
+        "1,000,000",
+        "esquivalience",
+    ]
+    cBs = word_cBs(words, "fr")
+    assert [cB_to_zipf(cB) for cB in cBs] == [zipf_frequency(word, "fr") for word in words]
+    assert word_cBs(words, "fr", minimum=-600) == [max(cB, -600) for cB in cBs]
+    assert [cB_to_zipf(cB) for cB in word_cBs(words, "fr", minimum=-600)] == [
+        zipf_frequency(word, "fr", minimum=3) for word in words
+    ]
+    tokens = [word for word in words if lossy_tokenize(word, "fr") == [word]]
+    assert token_cBs(tokens, "fr") == word_cBs(tokens, "fr")
+    assert token_cB("esquivalience", "fr", minimum=-1000) == -1000
+    with pytest.raises(ValueError):
+        token_cB("de la", "fr", strict=True)
+
+
+def test_frequency_cutoff():
+    full = wordfreq.get_frequency_list("en")
+    common = wordfreq.get_frequency_list("en", min_zipf=3)
+    assert common == full[: 900 - 300 + 1]
+    assert wordfreq.get_frequency_list("en", min_zipf=3.3) == full[:571]
+    top = wordfreq.get_frequency_list("en", max_words=1000)
+    assert top == full[: len(top)]
+    assert sum(map(len, top)) <= 1000 < sum(map(len, full[: len(top) + 1]))
+    assert get_cB_dict("en", min_zipf=3)["people"] == get_cB_dict("en")["people"]
+    assert "aardwolf" not in get_frequency_dict("en", min_zipf=3)
+
+    try:
+        set_frequency_cutoff(min_zipf=3)
+        assert zipf_frequency("People", "en") == 6.25
+        assert word_cB("the people", "en") > -300
+        # Words below the cutoff are treated as unknown
+        assert zipf_frequency("aardwolf", "en") == 0.0
+        assert word_frequency("aardwolf", "en", minimum=1e-6) == 1e-6
+        assert word_frequency("the aardwolf", "en") == 0.0
+    finally:
+        set_frequency_cutoff()
+    assert zipf_frequency("aardwolf", "en") > 0
+
+
+def test_band_rounding():
+    # Every band's frequency, rounded by `word_frequency`, still rounds to
+    # the same band on the Zipf scale
+    wordfreq._extend_band_entries(1500)
+    for index, (freq, rounded, cB) in enumerate(wordfreq._band_entries):
+        assert freq == cB_to_freq(-index)
+        assert cB == -index
+        assert round(wordfreq.freq_to_zipf(rounded), 2) == cB_to_zipf(-index)
+
+
+def test_band_entries_threads(monkeypatch):
+    # Threads extending the table at the same time leave every band at its
+    # own index. Switching threads very often makes a race likely to show up.
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        _extend_band_entries_in_threads(monkeypatch)
+    finally:
+        sys.setswitchinterval(switch_interval)
+
+
+def _extend_band_entries_in_threads(monkeypatch):
+    for _trial in range(10):
+        monkeypatch.setattr(wordfreq, "_band_entries", [])
+        barrier = threading.Barrier(8)
+
+        threads = [
+            threading.Thread(target=_extend_band_entries_after, args=(barrier, 1000 + i))
+            for i in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(wordfreq._band_entries) == 1007
+        assert [cB for _freq, _rounded, cB in wordfreq._band_entries] == list(range(0, -1007, -1))
+
+
+def _extend_band_entries_after(barrier, count):
+    barrier.wait()
+    for step in range(1, 11):
+        wordfreq._extend_band_entries(count * step // 10)
+
+
+def test_word_rank():
+    for rank, word in enumerate(itertools.islice(iter_wordlist("en"), 100)):
+        assert word_rank(word, "en") == rank
+    assert word_rank("The", "en") == 0
+    assert word_rank("of the", "en") is None
+    assert word_rank("esquivalience", "en") is None
+
+    # Ties within a band are broken alphabetically
+    assert word_frequency("bag", "en") == word_frequency("camp", "en")
+    assert word_rank("bag", "en") < word_rank("camp", "en")
+
+
+def test_sort_by_frequency():
+    words = ["esquivalience", "frequency", "2024", "of the", "Dog", "the", "camp", "bag"]
+    assert sort_by_frequency(words, "en") == [
+        "the",
+        "of the",
+        "Dog",
+        "bag",
+        "camp",
+        "2024",
+        "frequency",
+        "esquivalience",
+    ]
+    assert sort_by_frequency([], "en") == []
+
+
+def test_words_in_range():
+    words = words_in_range("en", 3.0, 3.5)
+    expected = [word for word in iter_wordlist("en") if 3.0 <= zipf_frequency(word, "en") <= 3.5]
+    assert list(words) == expected
+    assert len(words) == len(expected)
+    assert words[0] == expected[0] and words[-1] == expected[-1]
+    assert list(words[100:110]) == expected[100:110]
+    assert words[::100] == expected[::100]
+
+    filtered = words_in_range("en", 3.0, 3.5, ascii_only=True, include_digits=False)
+    assert list(filtered) == [
+        word for word in expected if max(word) <= "~" and not has_digit_sequence(word)
+    ]
+    assert list(filtered[5:]) == list(filtered)[5:]
+
+    assert list(words_in_range("en", 8.0, 9.0)) == []
+    assert list(words_in_range("en", 3.5, 3.0)) == []
+    assert words_in_range("en", 0.0, 9.0)[0] == "the"
+
+
+def test_complete():
+    assert complete("th", "en", 5) == ["the", "that", "this", "they", "their"]
+    assert complete("Don’", "en", 1) == ["don't"]
+    assert complete("xyzzyx", "en") == []
+
+    # Indexed prefixes and scanned prefixes give the same results as a
+    # search through the whole wordlist
+    wordlist = list(iter_wordlist("en"))
+    for prefix in ["", "inte", "quix", "esquiv", "zzz"]:
+        for k in [1, 10, 50]:
+            expected = [word for word in wordlist if word.startswith(prefix)][:k]
+            assert complete(prefix, "en", k) == expected
+
+
+def test_suggest():
+    assert suggest("recieve", "en", 1) == ["receive", "relieve"]
+    assert suggest("Definately", "en", k=1) == ["definitely"]
+    assert suggest("form", "en", k=1) == ["form"]
+    assert suggest("xqzvkj", "en", 1) == []
+
+    # The index finds the same words as comparing against every word
+    top_words = [
+        word
+        for word in itertools.islice(iter_wordlist("en"), 2000)
+        if not has_digit_sequence(word)
+    ]
+    for word in ["wierd", "speling", "teh", "b", "accomodation"]:
+        found = suggest(word, "en", max_distance=2, k=1000, top_n=2000)
+        expected = [other for other in top_words if wordfreq._edit_distance(word, other, 2) <= 2]
+        assert sorted(found) == sorted(expected)
+
+
+def test_edit_distance():
+    assert wordfreq._edit_distance("recieve", "receive", 2) == 1
+    assert wordfreq._edit_distance("kitten", "sitting", 3) == 3
+    assert wordfreq._edit_distance("kitten", "sitting", 2) == 3
+    assert wordfreq._edit_distance("", "abc", 5) == 3
+    assert wordfreq._edit_distance("ca", "abc", 5) == 3
+
+
+def test_match_pattern():
+    assert match_pattern("c?t", "en", 3) == ["cut", "cat", "cot"]
+    assert match_pattern("Don’t", "en") == ["don't"]
+    assert match_pattern("", "en") == []
+    assert match_pattern("*", "en", 0) == []
+
+    # The indexes find the same words as checking every word
+    wordlist = [word for word in iter_wordlist("en") if not has_digit_sequence(word)]
+    for pattern in ["c?t*", "?a???", "*ing", "*x*q*", "q??z", "*", "?*?", "a*b*c"]:
+        expr = re.compile(pattern.replace("?", ".").replace("*", ".*"))
+        expected = [word for word in wordlist if expr.fullmatch(word)][:20]
+        assert match_pattern(pattern, "en", 20) == expected
+
+
+def test_score_languages():
+    candidates = ["en", "fr", "de", "es", "tr", "ru", "ar", "ja", "zh", "ko"]
+    examples = {
+        "the quick brown fox jumps over the lazy dog": "en",
+        "le chat est sur la table": "fr",
+        "der Hund ist müde": "de",
+        "Bugün hava çok güzel": "tr",
+        "Привет, как дела?": "ru",
+        "我们今天去公园": "zh",
+        "今日は天気がいいです": "ja",
+        "오늘 날씨가 좋다": "ko",
+    }
+    for text, lang in examples.items():
+        scores = score_languages(text, candidates)
+        assert list(scores) == sorted(scores, key=scores.get, reverse=True)
+        assert set(scores) == set(candidates)
+        assert next(iter(scores)) == lang
+        assert next(iter(score_languages(text, candidates, margin=5.0))) == lang
+
+    assert score_languages("", ["en", "fr"]) == {"en": 0.0, "fr": 0.0}
+
+
+def test_score_languages_index(monkeypatch):
+    # With the combined index, the scores come from it without loading each
+    # wordlist, and match the scores from the wordlists
+    candidates = ["fr", "pt-BR", "en"]
+    text = "le chat a 2022 amis"
+    monkeypatch.setattr(wordfreq, "get_combined_index", _raise_missing_index)
+    expected = score_languages(text, candidates, "small")
+
+    available = available_languages("small")
+    index = CombinedIndex.build(
+        (lang, wordfreq.read_cBpack(available[lang])) for lang in ["en", "fr", "pt"]
+    )
+    monkeypatch.setattr(wordfreq, "get_combined_index", lambda wordlist: index)
+    get_cB_dict.cache_clear()
+    assert score_languages(text, candidates, "small") == expected
+    assert get_cB_dict.cache_info().currsize == 0
+
+
+def _raise_missing_index(wordlist):
+    raise FileNotFoundError
+
+
+def test_tokenizer_families():
+    # Languages in the same tokenizer family must tokenize text the same way
+    texts = ["İstanbul'da KIRMIZI", "Ţară şi ţară", "Straße café", "كَلِمَة", "схваташ"]
+    langs = ["en", "fr", "de", "ru", "el", "tr", "az", "ro", "sr", "ar", "fa", "he"]
+    for lang in langs:
+        for other in langs:
+            if _tokenizer_family(lang) == _tokenizer_family(other):
+                for text in texts:
+                    assert lossy_tokenize(text, lang) == lossy_tokenize(text, other)
+
+
 def test_most_common_words():
     # If something causes the most common words in well-supported languages to
     # change, we should know.
@@ -224,9 +549,22 @@ def test_normalization():
     ]
 
 
+def test_normalization_after_casefolding():
+    # "ǰ" has no precomposed uppercase. Case-folding it gives "j" plus a
+    # combining caron, and NFC normalization has to happen before tokens are
+    # case-folded again, as it always has, so the result is still decomposed.
+    assert tokenize("J\N{COMBINING CARON}ardin ǰ", "fr") == ["j\u030cardin", "j\u030c"]
+
+
 def test_uncurl_quotes():
     assert lossy_tokenize("let’s", "en") == ["let's"]
     assert word_frequency("let’s", "en") == word_frequency("let's", "en")
+    assert lossy_tokenize("l’heure “d’été”", "fr", include_punctuation=True) == [
+        "l'heure",
+        '"',
+        "d'été",
+        '"',
+    ]
 
 
 def test_phrase_freq():
@@ -246,6 +584,57 @@ def test_not_really_random():
     assert random_ascii_words(nwords=4, lang="ja", bits_per_word=0) == "1 1 1 1"
 
 
+def test_secure_ascii_words():
+    # The passphrase the README suggests making
+    words = random_ascii_words(secure=True).split()
+    assert len(words) == 5
+    assert all(word.isascii() for word in words)
+
+
+def test_sample():
+    words = sample("en", 100000, rng=random.Random(0))
+    assert len(words) == 100000
+    counts = collections.Counter(words)
+    # Words are drawn in proportion to their frequency
+    assert counts["the"] / 100000 == pytest.approx(word_frequency("the", "en"), rel=0.1)
+    assert counts["the"] > counts["of"] > counts["dog"]
+    assert not any(has_digit_sequence(word) for word in counts)
+
+    # The same seed gives the same words
+    assert sample("en", 100, rng=random.Random(1)) == sample("en", 100, rng=random.Random(1))
+
+    ascii_words = sample("es", 1000, ascii_only=True, secure=True)
+    assert all(max(word) <= "~" for word in ascii_words)
+    assert sample("en", 0) == []
+
+
+def test_top_n_slices():
+    # Every n is a prefix of the same list
+    top = top_n_list("en", 5000)
+    assert len(top) == 5000
+    assert top_n_list("en", 1000) == top[:1000]
+    assert top_n_list("en", 1001) == top[:1001]
+    assert not any(has_digit_sequence(word) for word in top)
+    assert all(max(word) <= "~" for word in top_n_list("fr", 1000, ascii_only=True))
+    # Small and large n find words in different ways, with the same results
+    assert (
+        top_n_list("fr", 1000, ascii_only=True) == top_n_list("fr", 2000, ascii_only=True)[:1000]
+    )
+    assert top_n_list("en", 0) == top_n_list("en", -5) == []
+    assert len(random_words("en", nwords=3, bits_per_word=16).split()) == 3
+
+
+def test_random_words_choices():
+    # Up to 16 bits per word, the choices come from scanning the top of the
+    # wordlist, without filtering all of it
+    wordfreq._filtered_positions.cache_clear()
+    words = random_words("en", nwords=50, bits_per_word=10, ascii_only=True).split()
+    assert wordfreq._filtered_positions.cache_info().currsize == 0
+    assert set(words) <= set(top_n_list("en", 1024, ascii_only=True))
+    words = random_words("en", nwords=50, bits_per_word=17).split()
+    assert set(words) <= set(top_n_list("en", 2**17))
+
+
 def test_not_enough_ascii():
     with pytest.raises(ValueError):
         random_ascii_words(lang="zh", bits_per_word=16)
@@ -0,0 +1,140 @@
+import asyncio
+import http.client
+import json
+import threading
+import time
+
+import pytest
+from wordfreq import tokenize, top_n_list, word_cB, zipf_frequency
+from wordfreq.server import WordfreqServer, lookup_words
+
+
+@pytest.fixture(scope="module")
+def server():
+    app = WordfreqServer(["en", "fr"])
+    loop = asyncio.new_event_loop()
+    listener = loop.run_until_complete(app.start("127.0.0.1", 0))
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    port = listener.sockets[0].getsockname()[1]
+    deadline = time.time() + 30
+    while not app.ready and time.time() < deadline:
+        time.sleep(0.05)
+    yield app, port
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+
+
+def request(conn, method, path, body=None):
+    conn.request(method, path, body=None if body is None else json.dumps(body))
+    response = conn.getresponse()
+    return response.status, json.loads(response.read())
+
+
+def test_lookups(server):
+    _app, port = server
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    # All of these requests use the same keep-alive connection
+    assert request(conn, "GET", "/readyz") == (200, {"ready": True})
+    status, result = request(conn, "GET", "/frequency?word=Caf%C3%A9&lang=fr")
+    assert status == 200
+    assert result["value"] == zipf_frequency("Café", "fr")
+
+    words = [f"word{i}" for i in range(200)] + ["the", "of"]
+    status, result = request(
+        conn, "POST", "/frequency", {"lang": "en", "words": words, "scale": "cB"}
+    )
+    assert result["values"] == [word_cB(word, "en") for word in words]
+
+    status, result = request(conn, "POST", "/tokenize", {"lang": "en", "text": "It's 2022!"})
+    assert result["tokens"] == tokenize("It's 2022!", "en")
+    assert result["values"] == [zipf_frequency(token, "en") for token in result["tokens"]]
+
+    status, result = request(conn, "GET", "/top?lang=fr&n=2")
+    assert result["words"] == ["de", "la"]
+    conn.close()
+
+
+def test_errors(server):
+    _app, port = server
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    assert request(conn, "GET", "/frequency?lang=en")[0] == 400
+    assert request(conn, "GET", "/frequency?word=x&lang=en&scale=bels")[0] == 400
+    assert request(conn, "GET", "/frequency?word=x&lang=qqq")[0] == 400
+    assert request(conn, "POST", "/frequency", {"lang": "en", "words": "the"})[0] == 400
+    # Parameters of the wrong type in a JSON body are the client's mistake
+    for params in [
+        {"lang": "en", "word": "the", "scale": ["zipf"]},
+        {"lang": "en", "word": "the", "wordlist": ["best"]},
+        {"lang": ["en"], "word": "the"},
+        {"lang": "en", "word": 5},
+    ]:
+        assert request(conn, "POST", "/frequency", params)[0] == 400
+    assert request(conn, "POST", "/top", {"lang": "en", "n": [5]})[0] == 400
+    assert request(conn, "GET", "/elsewhere?lang=en")[0] == 404
+    assert request(conn, "DELETE", "/top?lang=en")[0] == 405
+    assert request(conn, "GET", "/top?lang=en&n=-5")[0] == 400
+    assert request(conn, "GET", "/top?lang=en&n=10001")[0] == 400
+    # The connection is still usable after errors
+    assert request(conn, "GET", "/healthz") == (200, {"status": "ok"})
+    conn.close()
+
+
+def test_chunked_body(server):
+    _app, port = server
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    conn.putrequest("POST", "/frequency")
+    conn.putheader("Transfer-Encoding", "chunked")
+    conn.endheaders()
+    conn.send(b"0\r\n\r\n")
+    response = conn.getresponse()
+    assert response.status == 411
+    assert response.getheader("Connection") == "close"
+    conn.close()
+
+
+def test_loading_in_thread(server):
+    app, port = server
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    # German wasn't preloaded, so the first lookup loads it in the worker
+    # thread, and later ones are answered directly
+    assert ("lookup", "de", "best") not in app.loaded
+    _status, result = request(conn, "GET", "/frequency?word=der&lang=de")
+    assert result["value"] == zipf_frequency("der", "de")
+    assert ("lookup", "de", "best") in app.loaded
+    assert request(conn, "GET", "/top?lang=de&n=3")[1]["words"] == top_n_list("de", 3)
+    assert ("top", "de", "best") in app.loaded
+    conn.close()
+
+
+def test_stats(server):
+    _app, port = server
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    request(conn, "GET", "/frequency?word=the&lang=en")
+    request(conn, "GET", "/scan/for/things")
+    _status, stats = request(conn, "GET", "/stats")
+    assert stats["ready"]
+    assert stats["endpoints"]["/frequency"]["requests"] >= 1
+    assert stats["endpoints"]["other"]["requests"] >= 1
+    assert "/scan/for/things" not in stats["endpoints"]
+    assert stats["frequency_cache_size"] > 0
+    conn.close()
+
+
+def test_coalescing():
+    app = WordfreqServer([])
+    calls = []
+
+    def slow_lookup(*args):
+        calls.append(args)
+        time.sleep(0.1)
+        return lookup_words(*args)
+
+    async def lookups():
+        args = (("the", "of"), "en", "best", "zipf")
+        return await asyncio.gather(*[app.run(slow_lookup, *args) for _ in range(5)])
+
+    results = asyncio.run(lookups())
+    assert results == [[zipf_frequency("the", "en"), zipf_frequency("of", "en")]] * 5
+    assert len(calls) == 1
+    assert app.coalesced == 4
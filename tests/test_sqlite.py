@@ -0,0 +1,107 @@
+import itertools
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import wordfreq
+from wordfreq import (
+    disable_sqlite_backend,
+    enable_sqlite_backend,
+    export_sqlite,
+    iter_wordlist,
+    token_cBs,
+    token_frequency,
+    word_cB,
+    word_frequency,
+    zipf_frequency,
+)
+from wordfreq.sqlite import QUERY_BATCH_SIZE, SQLiteBackend
+
+
+@pytest.fixture(scope="module")
+def database(tmp_path_factory):
+    path = tmp_path_factory.mktemp("sqlite") / "wordfreq.sqlite"
+    export_sqlite(path, wordlists=["small"], languages=["en", "fr"])
+    return path
+
+
+@pytest.fixture
+def backend(database):
+    wordfreq._token_cache.clear()
+    yield enable_sqlite_backend(database)
+    disable_sqlite_backend()
+    wordfreq._token_cache.clear()
+
+
+def test_export(database):
+    with sqlite3.connect(database) as conn:
+        rows = conn.execute(
+            "SELECT word, cB, rank FROM words WHERE lang = 'en' AND wordlist = 'small' "
+            "ORDER BY rank LIMIT 3"
+        ).fetchall()
+        assert rows == [("the", -127, 0), ("to", -157, 1), ("and", -159, 2)]
+        assert conn.execute(
+            "SELECT source FROM wordlists WHERE lang = 'fr' AND wordlist = 'best'"
+        ).fetchone() == ("small",)
+    with pytest.raises(FileExistsError):
+        export_sqlite(database)
+
+
+def test_backend_lookups(database):
+    words = list(itertools.islice(iter_wordlist("fr", "small"), 0, None, 25))
+    words += ["De la", "2022", "Café", "esquivalience"]
+    expected = [
+        (word_frequency(word, "fr", "small"), zipf_frequency(word, "fr", "small"))
+        for word in words
+    ]
+    wordfreq._token_cache.clear()
+    enable_sqlite_backend(database)
+    try:
+        assert [
+            (word_frequency(word, "fr", "small"), zipf_frequency(word, "fr", "small"))
+            for word in words
+        ] == expected
+        assert word_cB("the", "en") == -127
+        assert token_frequency("2022", "fr-CA") == token_frequency("2022", "fr", "small")
+        assert word_frequency("the", "en", minimum=0.5) == 0.5
+        with pytest.raises(LookupError):
+            word_frequency("the", "en", "large")
+    finally:
+        disable_sqlite_backend()
+
+
+def test_batches(backend):
+    tokens = list(itertools.islice(iter_wordlist("en"), QUERY_BATCH_SIZE * 2 + 10))
+    found = backend.lookup(tokens + ["esquivalience"], "en")
+    assert len(found) == len(tokens)
+    assert token_cBs(tokens, "en") == [found[token] for token in tokens]
+    assert backend.top_n("fr", 3) == ["de", "la", "le"]
+
+
+def test_pool(database):
+    backend = SQLiteBackend(database, pool_size=2)
+    with ThreadPoolExecutor(8) as executor:
+        results = list(executor.map(lambda word: backend.lookup([word], "en"), ["the"] * 100))
+    assert results == [{"the": -127}] * 100
+    assert backend._opened <= 2
+    backend.close()
+
+
+@pytest.mark.parametrize(
+    "cutoff", [{"min_zipf": 5}, {"max_words": 1000}, {"min_zipf": 4.5, "max_words": 300}]
+)
+def test_backend_cutoff(database, cutoff):
+    words = list(itertools.islice(iter_wordlist("en", "small"), 0, 3000, 7))
+    wordfreq.set_frequency_cutoff(**cutoff)
+    try:
+        expected = [word_cB(word, "en", "small") for word in words]
+        assert -900 in expected and expected[0] > -900
+        wordfreq._token_cache.clear()
+        enable_sqlite_backend(database)
+        try:
+            assert [word_cB(word, "en", "small") for word in words] == expected
+        finally:
+            disable_sqlite_backend()
+    finally:
+        wordfreq.set_frequency_cutoff()
+        wordfreq._token_cache.clear()
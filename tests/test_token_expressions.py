@@ -0,0 +1,131 @@
+import random
+
+import pytest
+from wordfreq.preprocess import preprocess_text
+from wordfreq.tokens import (
+    SPACELESS_RE,
+    SPACELESS_START,
+    TOKEN_RE,
+    TOKEN_RE_WITH_PUNCTUATION,
+    _is_simple_latin,
+    _make_token_re,
+    _scan_simple_latin,
+    _select_token_re,
+    lossy_tokenize,
+    simple_tokenize,
+    tokenize,
+)
+
+# Pieces of text that exercise every case of the token expressions
+PIECES = list("abIéß12_ \xa0\n.,:;-!'’@") + [
+    "@s",
+    "qu'",
+    "l'h",
+    "d'",
+    "\N{COMBINING ACUTE ACCENT}",
+    "\N{ZERO WIDTH JOINER}",
+    "😀",
+    "©",
+    "ไทย",
+    "ั",
+    "ひらがな",
+    "カタカナ",
+    "漢字",
+    "ー",
+    "کلمه",
+    "हिन्दी",
+]
+
+EXAMPLES = [
+    "",
+    "the quick brown fox",
+    "l'heure d'été, qu'un homme",
+    "tod@s l@s niñ@s, @s amig@s",
+    "won't e.g. 1,000.5 a_b",
+    "ひらがなカタカナromaji",
+    "Hello 世界, ภาษาไทย!",
+    "👨‍👩‍👧 family",
+]
+
+
+def _random_texts(count, seed):
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield "".join(rng.choice(PIECES) for _ in range(rng.randint(0, 10)))
+
+
+@pytest.mark.parametrize("include_punctuation", [False, True])
+def test_specialized_expressions_match(include_punctuation):
+    # The expression chosen for a particular text has to find the same
+    # tokens that the full expression would
+    full_re = TOKEN_RE_WITH_PUNCTUATION if include_punctuation else TOKEN_RE
+    for text in EXAMPLES + list(_random_texts(5000, seed=27)):
+        expected = full_re.findall(text)
+        assert _select_token_re(text, include_punctuation).findall(text) == expected
+        assert _make_token_re(True, True, True, include_punctuation).findall(text) == expected
+
+
+def test_expression_selection():
+    assert _select_token_re("the dog", False) is _make_token_re(False, False, False, False)
+    assert _select_token_re("l'heure", False) is _make_token_re(False, True, False, False)
+    assert _select_token_re("tod@s", True) is _make_token_re(False, False, True, True)
+    assert _select_token_re("犬ヶ島", False) is _make_token_re(True, False, False, False)
+
+
+def test_spaceless_start():
+    # We skip looking for spaceless scripts in text whose characters are all
+    # lower than SPACELESS_START
+    for codept in range(ord(SPACELESS_START)):
+        assert not SPACELESS_RE.match(chr(codept))
+    assert SPACELESS_RE.match(SPACELESS_START)
+
+
+# Characters that are likely to affect word breaks in simple Latin text
+SIMPLE_LATIN_PIECES = list("aeIOyÀÉßÿ0129_ \t\n.,:;'@-!?\"/&\x00~") + ["@s", "qu'", "L'H", "d'é"]
+SIMPLE_LATIN_EXAMPLES = [
+    "The quick brown fox",
+    "l'heure d'été, qu'un homme",
+    "tod@s l@s niñ@s, @s amig@s",
+    "won't e.g. 1,000.5 3:00 a_b _ __init__",
+    "Straße STRASSE ÿ",
+    "'quoted' \"quoted\" (parens) a-b a/b",
+]
+
+
+def _random_simple_latin(count, seed):
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield "".join(rng.choice(SIMPLE_LATIN_PIECES) for _ in range(rng.randint(0, 12)))
+
+
+def _regex_tokens(text, lang):
+    # What the regex tokenizer finds in this text, without any fast paths
+    text = preprocess_text(text, lang)
+    return [token.strip("'").casefold() for token in TOKEN_RE.findall(text)]
+
+
+def test_simple_latin_scanner():
+    for text in SIMPLE_LATIN_EXAMPLES + list(_random_simple_latin(20000, seed=28)):
+        assert _is_simple_latin(text)
+        expected = [token.strip("'") for token in TOKEN_RE.findall(text)]
+        assert _scan_simple_latin(text) == expected
+        assert simple_tokenize(text) == [token.casefold() for token in expected]
+
+
+@pytest.mark.parametrize("lang", ["en", "fr", "de", "es", "sr"])
+def test_simple_latin_fast_path(lang):
+    for text in SIMPLE_LATIN_EXAMPLES + list(_random_simple_latin(2000, seed=lang)):
+        expected = _regex_tokens(text, lang)
+        assert tokenize(text, lang) == expected
+        assert lossy_tokenize(text, lang) == expected
+
+
+def test_not_simple_latin():
+    # Text outside of the fast path still gets tokenized
+    assert not _is_simple_latin("can’t")
+    assert lossy_tokenize("can’t", "en") == ["can't"]
+    assert not _is_simple_latin("naïve\N{COMBINING ACUTE ACCENT}")
+    assert not _is_simple_latin("© 2024")
+
+    # Turkish case-folds "I" differently, so it doesn't use the fast path
+    assert tokenize("KIRMIZI", "tr") == ["kırmızı"]
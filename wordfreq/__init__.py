@@ -1,27 +1,78 @@
 from __future__ import annotations
 
+import atexit
+import bisect
+import gc
 import gzip
+import hashlib
+import heapq
 import itertools
 import logging
 import math
+import os
 import random
+import secrets
+import threading
 import warnings
+from array import array
+from collections import defaultdict
+from collections.abc import Sequence
 from functools import lru_cache
-from typing import Iterator
+from pathlib import Path
+from typing import Iterable, Iterator, overload
 
 import langcodes
 import msgpack
+import regex
 
+from wordfreq.combined import CombinedIndex
+from wordfreq.diskcache import DEFAULT_MAX_ENTRIES, DiskCache
 from wordfreq.language_info import get_language_info
 from wordfreq.numbers import digit_freq, has_digit_sequence, smash_numbers
-from wordfreq.tokens import lossy_tokenize, simple_tokenize, tokenize
+from wordfreq.sqlite import SQLiteBackend, export_sqlite
+from wordfreq.tokens import (
+    _tokenizer_family,
+    lossy_normalize,
+    lossy_tokenize,
+    simple_tokenize,
+    tokenize,
+)
 
-from .util import data_path
+from .util import cache_path, data_path
 
 logger = logging.getLogger(__name__)
 
 
 CACHE_SIZE = 100000
+
+# The number of the most frequent words in each wordlist whose common surface
+# forms get precomputed frequencies (see `_surface_form_table`)
+SURFACE_FORM_WORDS = 1000
+
+# `complete` precomputes this many of the top completions for each prefix that
+# matches more than COMPLETE_SCAN_SIZE words, and finds the completions of
+# other prefixes by sorting the ranks of the words they match
+COMPLETE_TOP_K = 20
+COMPLETE_SCAN_SIZE = 64
+
+# `suggest` indexes this many of the most frequent words by default, and only
+# indexes the deletions from the first SUGGEST_PREFIX_LENGTH characters of
+# each word, to bound the memory the index takes up
+SUGGEST_WORDS = 30000
+SUGGEST_PREFIX_LENGTH = 7
+
+# `top_n_list` finds up to this many words by scanning the start of the
+# wordlist, instead of filtering the whole wordlist so it can slice any number
+# of words from the result
+TOP_N_SCAN_SIZE = 1000
+
+# `random_words` scans for its choices the same way when there are up to this
+# many of them, which covers up to 16 bits per word
+RANDOM_WORDS_SCAN_SIZE = 2**16
+
+# `match_pattern` indexes the characters at this many positions from the start
+# and end of each word
+PATTERN_POSITIONS = 4
 DATA_PATH = data_path()
 
 # We'll divide the frequency by 10 for each token boundary that was inferred.
@@ -32,13 +83,16 @@ DATA_PATH = data_path()
 # frequency.)
 INFERRED_SPACE_FACTOR = 10.0
 
-# tokenize and simple_tokenize are imported so that other things can import
-# them from here. Suppress the pyflakes warning.
+# tokenize, simple_tokenize, and export_sqlite are imported so that other
+# things can import them from here. Suppress the pyflakes warning.
 tokenize = tokenize
 simple_tokenize = simple_tokenize
+export_sqlite = export_sqlite
 
 
-def read_cBpack(filename: str) -> list[list[str]]:
+def read_cBpack(
+    filename: str, max_band: int | None = None, max_words: int | None = None
+) -> list[list[str]]:
     """
     Read a file from an idiosyncratic format that we use for storing
     approximate word frequencies, called "cBpack".
@@ -78,13 +132,37 @@ def read_cBpack(filename: str) -> list[list[str]]:
             [], [], [], ...    # 29 more empty lists
             ['blue', 'red']
         ]
+
+    To read only the most frequent words, set `max_band` to stop after the
+    list at that index, or `max_words` to stop before the list that would
+    make the total number of words greater than that. The file is decoded
+    one list at a time in that case, and the rest of it is never read.
     """
     with gzip.open(filename, "rb") as infile:
-        data = msgpack.load(infile, raw=False)
-    header = data[0]
+        if max_band is None and max_words is None:
+            data = msgpack.load(infile, raw=False)
+            _check_cBpack_header(data[0])
+            return data[1:]
+
+        unpacker = msgpack.Unpacker(infile, raw=False)
+        length = unpacker.read_array_header()
+        _check_cBpack_header(unpacker.unpack())
+        bands: list[list[str]] = []
+        total = 0
+        for index in range(length - 1):
+            if max_band is not None and index > max_band:
+                break
+            bucket = unpacker.unpack()
+            total += len(bucket)
+            if max_words is not None and total > max_words:
+                break
+            bands.append(bucket)
+        return bands
+
+
+def _check_cBpack_header(header: object) -> None:
     if not isinstance(header, dict) or header.get("format") != "cB" or header.get("version") != 1:
         raise ValueError("Unexpected header: %r" % header)
-    return data[1:]
 
 
 def available_languages(wordlist: str = "best") -> dict[str, str]:
@@ -110,9 +188,23 @@ def available_languages(wordlist: str = "best") -> dict[str, str]:
     return available
 
 
+def _zipf_to_band(min_zipf: float) -> int:
+    """
+    Get the index of the last band in a cBpack whose words are at least
+    `min_zipf` on the Zipf scale.
+    """
+    # Round first, so that float error in something like 3.3 * 100 doesn't
+    # leave out the band exactly at the cutoff
+    return math.floor(round(900 - min_zipf * 100, 6))
+
+
 @lru_cache(maxsize=None)
 def get_frequency_list(
-    lang: str, wordlist: str = "best", match_cutoff: None = None
+    lang: str,
+    wordlist: str = "best",
+    match_cutoff: None = None,
+    min_zipf: float | None = None,
+    max_words: int | None = None,
 ) -> list[list[str]]:
     """
     Read the raw data from a wordlist file, returning it as a list of
@@ -122,6 +214,11 @@ def get_frequency_list(
     variations in language codes. For example, looking for 'pt-BR',
     'pt_br', or even 'PT_BR' will get you the 'pt' (Portuguese) list.
     Looking up the alternate code 'por' will also get the same list.
+
+    `min_zipf` and `max_words` read only the start of the list: the bands of
+    words whose Zipf frequency is at least `min_zipf`, and as many whole
+    bands as fit in `max_words` words. The rest of the file isn't decoded,
+    so this takes less time and memory. Each cutoff is cached separately.
     """
     if match_cutoff is not None:
         warnings.warn(
@@ -141,7 +238,8 @@ def get_frequency_list(
             f"nearest match, which is {best!r}."
         )
 
-    return read_cBpack(available[best])
+    max_band = None if min_zipf is None else _zipf_to_band(min_zipf)
+    return read_cBpack(available[best], max_band, max_words)
 
 
 def cB_to_freq(cB: int) -> float:
@@ -196,20 +294,39 @@ def freq_to_zipf(freq: float) -> float:
     return math.log(freq, 10) + 9
 
 
+def _cutoff_args(min_zipf: float | None, max_words: int | None) -> dict:
+    """
+    Get the keyword arguments for `get_frequency_list` with a cutoff, leaving
+    out the ones that aren't set, so that a list without a cutoff is only
+    cached once.
+    """
+    args: dict = {}
+    if min_zipf is not None:
+        args["min_zipf"] = min_zipf
+    if max_words is not None:
+        args["max_words"] = max_words
+    return args
+
+
 @lru_cache(maxsize=None)
 def get_frequency_dict(
-    lang: str, wordlist: str = "best", match_cutoff: None = None
+    lang: str,
+    wordlist: str = "best",
+    match_cutoff: None = None,
+    min_zipf: float | None = None,
+    max_words: int | None = None,
 ) -> dict[str, float]:
     """
     Get a word frequency list as a dictionary, mapping tokens to
-    frequencies as floating-point probabilities.
+    frequencies as floating-point probabilities. `min_zipf` and `max_words`
+    leave out the less frequent words, as in `get_frequency_list`.
     """
     if match_cutoff is not None:
         warnings.warn(
             "The `match_cutoff` parameter is deprecated", DeprecationWarning, stacklevel=2
         )
     freqs = {}
-    pack = get_frequency_list(lang, wordlist)
+    pack = get_frequency_list(lang, wordlist, **_cutoff_args(min_zipf, max_words))
     for index, bucket in enumerate(pack):
         freq = cB_to_freq(-index)
         for word in bucket:
@@ -217,6 +334,114 @@ def get_frequency_dict(
     return freqs
 
 
+@lru_cache(maxsize=None)
+def get_cB_dict(
+    lang: str, wordlist: str = "best", min_zipf: float | None = None, max_words: int | None = None
+) -> dict[str, int]:
+    """
+    Get a word frequency list as a dictionary, mapping tokens to their
+    frequencies in centibels (see `cB_to_freq`), which are integers that are
+    0 or less. This is how the frequencies are stored, without converting
+    them to floating-point probabilities like `get_frequency_dict` does.
+    `min_zipf` and `max_words` work as in `get_frequency_list`.
+    """
+    cBs = {}
+    pack = get_frequency_list(lang, wordlist, **_cutoff_args(min_zipf, max_words))
+    _extend_band_entries(len(pack))
+    for index, bucket in enumerate(pack):
+        cB = -index
+        for word in bucket:
+            cBs[word] = cB
+    return cBs
+
+
+def _wordlist_source(wordlist: str) -> str:
+    """
+    Get a short string that identifies the contents of the wordlist files for
+    `wordlist`, to tell whether a combined index was built from them.
+    """
+    digest = hashlib.sha1()
+    for lang, filename in sorted(available_languages(wordlist).items()):
+        digest.update(f"{lang}\n".encode())
+        with open(filename, "rb") as infile:
+            for chunk in iter(lambda: infile.read(1 << 20), b""):
+                digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+def build_combined_index(wordlist: str = "best") -> CombinedIndex:
+    """
+    Build a `CombinedIndex` of all the languages that `wordlist` is
+    available in. This reads every wordlist file, so it takes a while and a
+    lot of memory; see `save_combined_index` for a way to do it ahead of
+    time.
+    """
+    available = available_languages(wordlist)
+    return CombinedIndex.build(
+        ((lang, read_cBpack(available[lang])) for lang in sorted(available)),
+        _wordlist_source(wordlist),
+    )
+
+
+def _combined_index_path(wordlist: str) -> Path:
+    return cache_path(f"combined_{wordlist}.msgpack.gz")
+
+
+def save_combined_index(wordlist: str = "best") -> Path:
+    """
+    Build the `CombinedIndex` for `wordlist`, and save it in wordfreq's cache
+    directory (see `wordfreq.util.cache_path`), where `get_combined_index`
+    will find it. Returns the path it was saved to.
+
+    The `wordfreq build-index` command does the same thing.
+    """
+    path = _combined_index_path(wordlist)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    index = build_combined_index(wordlist)
+    # Write to a temporary file first, so that a process loading the index
+    # never sees half of it
+    temp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    index.save(str(temp_path))
+    os.replace(temp_path, path)
+    get_combined_index.cache_clear()
+    return path
+
+
+@lru_cache(maxsize=None)
+def get_combined_index(wordlist: str = "best") -> CombinedIndex:
+    """
+    Get the `CombinedIndex` of all the languages that `wordlist` is available
+    in.
+
+    wordfreq doesn't come with this index, because it's large and most people
+    don't need it. Make it once with `save_combined_index` or the `wordfreq
+    build-index` command, which take much more time and memory than loading
+    it does. Until then, this raises a FileNotFoundError.
+
+    The index records which wordlist files it was built from. If they've
+    changed since, such as after upgrading wordfreq, this raises a
+    ValueError instead of giving frequencies that disagree with the
+    wordlists.
+    """
+    if wordlist == "combined":
+        logger.warning("The 'combined' wordlists have been renamed to 'small'.")
+        wordlist = "small"
+    path = _combined_index_path(wordlist)
+    command = "wordfreq build-index" + ("" if wordlist == "best" else f" --wordlist {wordlist}")
+    if not path.exists():
+        raise FileNotFoundError(
+            f"There's no combined index for the {wordlist!r} wordlist at {path}. "
+            f"Run `{command}` to make it."
+        )
+    index = CombinedIndex.load(str(path))
+    if index.source != _wordlist_source(wordlist):
+        raise ValueError(
+            f"The combined index at {path} was built from different {wordlist!r} "
+            f"wordlists than the ones installed. Run `{command}` to rebuild it."
+        )
+    return index
+
+
 def iter_wordlist(lang: str, wordlist: str = "best") -> Iterator[str]:
     """
     Yield the words in a wordlist in approximate descending order of
@@ -229,37 +454,306 @@ def iter_wordlist(lang: str, wordlist: str = "best") -> Iterator[str]:
     return itertools.chain(*get_frequency_list(lang, wordlist))
 
 
-# This dict and inner function are used to implement a "drop everything" cache
-# for word_frequency(); the overheads of lru_cache() are comparable to the time
-# it takes to look up frequencies from scratch, so something faster is needed.
-_wf_cache: dict[tuple[str, str, str, float], float] = {}
+@lru_cache(maxsize=None)
+def _band_offsets(lang: str, wordlist: str) -> list[int]:
+    """
+    Get the positions in `iter_wordlist` where each centibel band of a
+    wordlist starts. The words at -i cB are the ones from position
+    `offsets[i]` up to `offsets[i + 1]`.
+    """
+    offsets = [0]
+    for bucket in get_frequency_list(lang, wordlist):
+        offsets.append(offsets[-1] + len(bucket))
+    return offsets
 
 
-def _word_frequency(word: str, lang: str, wordlist: str, minimum: float) -> float:
-    tokens = lossy_tokenize(word, lang)
+@lru_cache(maxsize=None)
+def _word_array(lang: str, wordlist: str) -> list[str]:
+    """
+    Get the words of a wordlist as one list, in the order of `iter_wordlist`.
+    """
+    return list(iter_wordlist(lang, wordlist))
+
+
+@lru_cache(maxsize=None)
+def _rank_dict(lang: str, wordlist: str) -> dict[str, int]:
+    """
+    Get a dictionary from each word in a wordlist to its position in
+    `iter_wordlist`.
+    """
+    return {word: rank for rank, word in enumerate(_word_array(lang, wordlist))}
+
+
+@lru_cache(maxsize=None)
+def _filtered_positions(
+    lang: str, wordlist: str, ascii_only: bool, include_digits: bool
+) -> array[int]:
+    """
+    Get the positions in `iter_wordlist` of the words that pass the filters
+    that `words_in_range`, `top_n_list`, and `sample` offer, in increasing
+    order. Any number of the top words that pass the filters can be sliced
+    from this.
+    """
+    positions = array("l")
+    for pos, word in enumerate(_word_array(lang, wordlist)):
+        if ascii_only and max(word) > "~":
+            continue
+        if not include_digits and has_digit_sequence(word):
+            continue
+        positions.append(pos)
+    return positions
+
+
+def _cB_array(lang: str, wordlist: str) -> array[int]:
+    """
+    Get the frequency in centibels of each word in `iter_wordlist`, as an
+    array of 16-bit integers, filled in a band at a time.
+    """
+    cBs = array("h")
+    offsets = _band_offsets(lang, wordlist)
+    for index in range(len(offsets) - 1):
+        cBs.extend(array("h", [-index]) * (offsets[index + 1] - offsets[index]))
+    return cBs
+
+
+def get_frequency_array(lang: str, wordlist: str = "best", library: str = "numpy") -> tuple:
+    """
+    Get a whole wordlist as a pair of arrays, for analyzing it with other
+    tools: the words, in the order of `iter_wordlist`, and their frequencies
+    in centibels (see `get_cB_dict`) as a contiguous array of 16-bit
+    integers.
+
+    With `library="numpy"`, the words are a NumPy array of Python strings
+    and the frequencies are an `int16` NumPy array. With `library="arrow"`,
+    they're a PyArrow string array and `int16` array. These libraries aren't
+    dependencies of wordfreq, so you need to install the one you use.
+
+    The frequencies are filled in a band at a time, without making a Python
+    object for each word's frequency.
+    """
+    words = _word_array(lang, wordlist)
+    cBs = _cB_array(lang, wordlist)
+    if library == "numpy":
+        import numpy as np
+
+        return np.array(words, dtype=object), np.frombuffer(cBs, dtype=np.int16)
+    elif library == "arrow":
+        import pyarrow as pa
+
+        cB_array = pa.Array.from_buffers(pa.int16(), len(cBs), [None, pa.py_buffer(cBs)])
+        return pa.array(words, type=pa.string()), cB_array
+    else:
+        raise ValueError(f"Unknown array library {library!r}; use 'numpy' or 'arrow'")
+
+
+def write_frequency_table(filename: str, lang: str, wordlist: str = "best") -> None:
+    """
+    Write a wordlist to a file that other data tools can read, with a `word`
+    column and a `cB` column as in `get_frequency_array`. This requires
+    PyArrow.
+
+    If `filename` ends in `.parquet`, it's written as a Parquet file.
+    Otherwise, it's written in the Arrow IPC file format, which is also
+    known as Feather.
+    """
+    import pyarrow as pa
+
+    words, cBs = get_frequency_array(lang, wordlist, library="arrow")
+    table = pa.table({"word": words, "cB": cBs})
+    if str(filename).endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        pq.write_table(table, filename)
+    else:
+        from pyarrow import feather
+
+        feather.write_feather(table, filename)
 
+
+# These dicts implement a two-level "drop everything" cache for
+# word_frequency(); the overheads of lru_cache() are comparable to the time it
+# takes to look up frequencies from scratch, so something faster is needed.
+#
+# The first level maps (text, lang) to the tokens that `lossy_tokenize`
+# produces. The second level maps (tokens, lang, wordlist) to the entry for
+# those tokens before `minimum` is applied (see `_frequency_entry`), or to
+# None if they aren't in the wordlist. Because `minimum` isn't part of either
+# key, lookups with different minimums, including the ones that
+# `zipf_frequency` makes, share their entries.
+_token_cache: dict[tuple[str, str], tuple[str, ...]] = {}
+_freq_cache: dict[tuple[tuple[str, ...], str, str], tuple[float, float, int] | None] = {}
+
+# An optional cache of tokens on disk, which is consulted when text isn't in
+# `_token_cache`. See `enable_disk_cache`.
+_disk_cache: DiskCache | None = None
+_disk_cache_all_languages = False
+
+# The tokenizers that are slow enough that their results go in the disk cache
+DISK_CACHE_TOKENIZERS = {"mecab", "jieba"}
+
+# An optional database that frequencies are looked up in, instead of the
+# wordlists in memory. See `enable_sqlite_backend`.
+_sqlite_backend: SQLiteBackend | None = None
+
+# The keyword arguments for `get_cB_dict` that limit the wordlists that
+# lookups load to their most frequent words. See `set_frequency_cutoff`.
+_frequency_cutoff: dict = {}
+
+
+def _round_frequency(freq: float, minimum: float) -> float:
+    # All our frequency data is only precise to within 1% anyway, so round
+    # it to 3 significant digits
+    unrounded = max(freq, minimum)
+    if unrounded == 0.0:
+        return 0.0
+    else:
+        leading_zeroes = math.floor(-math.log(unrounded, 10))
+        return round(unrounded, leading_zeroes + 3)
+
+
+def _frequency_entry(freq: float) -> tuple[float, float, int]:
+    """
+    Make the entry that the frequency caches store for a frequency: the
+    frequency itself, the frequency rounded the way `word_frequency` returns
+    it, and the rounded frequency in whole centibels, which is what
+    `zipf_frequency` rounds to.
+    """
+    rounded = _round_frequency(freq, 0.0)
+    if rounded == 0.0:
+        # The frequency underflowed, which can happen to very long text. Give
+        # it a number of centibels below any minimum anyone would ask for.
+        return freq, rounded, -(10**9)
+    cB = round(round(freq_to_zipf(rounded), 2) * 100) - 900
+    return freq, rounded, cB
+
+
+# The entry for each centibel band, indexed by the band's position in a
+# cBpack. A token without digits has exactly its band's frequency, so this
+# lets looking it up skip all the floating-point work.
+_band_entries: list[tuple[float, float, int]] = []
+_band_entries_lock = threading.Lock()
+
+
+def _extend_band_entries(count: int) -> None:
+    """
+    Make sure `_band_entries` has entries for at least `count` bands.
+
+    The list is never changed in place. A longer one is built and swapped in
+    whole, under a lock, so other threads reading it always see each band at
+    its own index.
+    """
+    global _band_entries
+    if count <= len(_band_entries):
+        return
+    with _band_entries_lock:
+        entries = _band_entries
+        if count > len(entries):
+            _band_entries = entries + [
+                _frequency_entry(cB_to_freq(-index)) for index in range(len(entries), count)
+            ]
+
+
+def _band_entry(cB: int, token: str, smashed: str) -> tuple[float, float, int]:
+    """
+    Get the entry for a token that was found in a dictionary from
+    `get_cB_dict`, where `smashed` is the form it was found under.
+    """
+    entry = _band_entries[-cB]
+    if smashed != token:
+        # If there is a digit sequence in the token, the digits are
+        # internally replaced by 0s to aggregate their probabilities
+        # together. We then assign a specific frequency to the digit
+        # sequence using the `digit_freq` distribution.
+        return _frequency_entry(entry[0] * digit_freq(token))
+    return entry
+
+
+def _token_cB_dict(tokens: Iterable[str], lang: str, wordlist: str) -> dict[str, int]:
+    """
+    Get a dictionary of centibel frequencies to look up `tokens` in. This is
+    the whole wordlist from `get_cB_dict`, unless there's a SQLite backend,
+    in which case it's just the entries for these tokens. Either way, it
+    leaves out the words below `set_frequency_cutoff`.
+    """
+    backend = _sqlite_backend
+    if backend is None:
+        return get_cB_dict(lang, wordlist, **_frequency_cutoff)
+    tokens = [smash_numbers(token) for token in tokens]
+    return backend.lookup(tokens, lang, wordlist, **_frequency_cutoff)
+
+
+def _lookup_token(token: str, cBs: dict[str, int]) -> tuple[float, float, int] | None:
+    """
+    Look up one token that has already been through `lossy_tokenize`, in the
+    dictionary from `get_cB_dict`. Returns its entry (see
+    `_frequency_entry`), or None if the token isn't there.
+    """
+    smashed = smash_numbers(token)
+    cB = cBs.get(smashed)
+    if cB is None:
+        return None
+    return _band_entry(cB, token, smashed)
+
+
+@lru_cache(maxsize=None)
+def _surface_form_table(lang: str, wordlist: str) -> dict[str, tuple[float, float, int]]:
+    """
+    Precompute `word_frequency` results for the most common ways of writing
+    the most frequent words in a wordlist: lowercase, capitalized, all caps,
+    and with curly apostrophes. Most real lookups are for one of these, and
+    this lets them skip tokenization.
+
+    The table maps each surface form to its entry (see `_frequency_entry`).
+    A form is only included if `lossy_tokenize` turns it into the word it
+    came from, so this gives the same results as tokenizing it would.
+
+    The table is built from the same wordlist that lookups use, so it
+    follows `set_frequency_cutoff`, which clears this cache.
+    """
+    try:
+        pack = get_frequency_list(lang, wordlist, **_frequency_cutoff)
+        cBs = get_cB_dict(lang, wordlist, **_frequency_cutoff)
+    except LookupError:
+        # Let the lookup itself raise the error when it needs the wordlist
+        return {}
+
+    table = {}
+    for word in itertools.islice(itertools.chain(*pack), SURFACE_FORM_WORDS):
+        entry = _lookup_token(word, cBs)
+        if entry is None:
+            continue
+        for form in {word, word[:1].upper() + word[1:], word.upper()}:
+            for variant in {form, form.replace("'", "\N{RIGHT SINGLE QUOTATION MARK}")}:
+                if variant not in table and lossy_tokenize(variant, lang) == [word]:
+                    table[variant] = entry
+    return table
+
+
+def _tokens_frequency(
+    tokens: tuple[str, ...], lang: str, wordlist: str
+) -> tuple[float, float, int] | None:
+    """
+    Look up the combined frequency of the tokens that a piece of text was
+    split into. Returns its entry (see `_frequency_entry`), or None if there
+    are no tokens or any of them is missing from the wordlist.
+    """
     if not tokens:
-        return minimum
+        return None
+
+    cBs = _token_cB_dict(tokens, lang, wordlist)
+    if len(tokens) == 1:
+        return _lookup_token(tokens[0], cBs)
 
     # Frequencies for multiple tokens are combined using the formula
     #     1 / f = 1 / f1 + 1 / f2 + ...
     # Thus the resulting frequency is less than any individual frequency, and
     # the smallest frequency dominates the sum.
-    freqs = get_frequency_dict(lang, wordlist)
     one_over_result = 0.0
     for token in tokens:
-        smashed = smash_numbers(token)
-        if smashed not in freqs:
-            # If any word is missing, just return the default value
-            return minimum
-        freq = freqs[smashed]
-        if smashed != token:
-            # If there is a digit sequence in the token, the digits are
-            # internally replaced by 0s to aggregate their probabilities
-            # together. We then assign a specific frequency to the digit
-            # sequence using the `digit_freq` distribution.
-            freq *= digit_freq(token)
-        one_over_result += 1.0 / freq
+        entry = _lookup_token(token, cBs)
+        if entry is None:
+            return None
+        one_over_result += 1.0 / entry[0]
 
     # Combine the frequencies of tokens we looked up.
     freq = 1.0 / one_over_result
@@ -270,14 +764,75 @@ def _word_frequency(word: str, lang: str, wordlist: str, minimum: float) -> floa
         # probability for each word break that was inferred.
         freq *= INFERRED_SPACE_FACTOR ** -(len(tokens) - 1)
 
-    # All our frequency data is only precise to within 1% anyway, so round
-    # it to 3 significant digits
-    unrounded = max(freq, minimum)
-    if unrounded == 0.0:
-        return 0.0
-    else:
-        leading_zeroes = math.floor(-math.log(unrounded, 10))
-        return round(unrounded, leading_zeroes + 3)
+    return _frequency_entry(freq)
+
+
+def _apply_minimum(entry: tuple[float, float, int] | None, minimum: float) -> float:
+    if entry is None:
+        # If any word is missing, just return the default value
+        return minimum
+    freq, rounded, _cB = entry
+    if freq >= minimum:
+        return rounded
+    return _round_frequency(freq, minimum)
+
+
+def _word_frequency(word: str, lang: str, wordlist: str, minimum: float) -> float:
+    """
+    Compute `word_frequency` without using its cache.
+    """
+    entry = None
+    if _sqlite_backend is None:
+        entry = _surface_form_table(lang, wordlist).get(word)
+    if entry is None:
+        tokens = tuple(lossy_tokenize(word, lang))
+        entry = _tokens_frequency(tokens, lang, wordlist)
+    return _apply_minimum(entry, minimum)
+
+
+def _disk_cached_tokens(word: str, lang: str) -> tuple[str, ...]:
+    disk_cache = _disk_cache
+    if disk_cache is None or not (
+        _disk_cache_all_languages or get_language_info(lang)["tokenizer"] in DISK_CACHE_TOKENIZERS
+    ):
+        return tuple(lossy_tokenize(word, lang))
+
+    tokens = disk_cache.get(word, lang)
+    if tokens is None:
+        tokens = tuple(lossy_tokenize(word, lang))
+        disk_cache.put(word, lang, tokens)
+    return tokens
+
+
+def _cached_tokens(word: str, lang: str) -> tuple[str, ...]:
+    token_key = (word, lang)
+    try:
+        return _token_cache[token_key]
+    except KeyError:
+        if len(_token_cache) >= CACHE_SIZE:
+            _token_cache.clear()
+        tokens = _token_cache[token_key] = _disk_cached_tokens(word, lang)
+        return tokens
+
+
+def _cached_frequency(word: str, lang: str, wordlist: str) -> tuple[float, float, int] | None:
+    tokens = _token_cache.get((word, lang))
+    if tokens is None:
+        if _sqlite_backend is None:
+            # The surface form table needs the wordlist in memory
+            common = _surface_form_table(lang, wordlist).get(word)
+            if common is not None:
+                return common
+        tokens = _cached_tokens(word, lang)
+
+    freq_key = (tokens, lang, wordlist)
+    try:
+        return _freq_cache[freq_key]
+    except KeyError:
+        if len(_freq_cache) >= CACHE_SIZE:
+            _freq_cache.clear()
+        entry = _freq_cache[freq_key] = _tokens_frequency(tokens, lang, wordlist)
+        return entry
 
 
 def word_frequency(word: str, lang: str, wordlist: str = "best", minimum: float = 0.0) -> float:
@@ -297,14 +852,140 @@ def word_frequency(word: str, lang: str, wordlist: str = "best", minimum: float
     You could set this value to 10^-8, for example, to return 10^-8 for
     unknown words in the 'large' list instead of 0, avoiding a discontinuity.
     """
-    args = (word, lang, wordlist, minimum)
-    try:
-        return _wf_cache[args]
-    except KeyError:
-        if len(_wf_cache) >= CACHE_SIZE:
-            _wf_cache.clear()
-        _wf_cache[args] = _word_frequency(*args)
-        return _wf_cache[args]
+    return _apply_minimum(_cached_frequency(word, lang, wordlist), minimum)
+
+
+def enable_disk_cache(
+    path: str | os.PathLike,
+    max_entries: int = DEFAULT_MAX_ENTRIES,
+    snapshot: str | os.PathLike | None = None,
+    all_languages: bool = False,
+) -> DiskCache:
+    """
+    Keep the results of tokenizing text for `word_frequency` and
+    `zipf_frequency` in an SQLite file at `path`, so they can be reused after
+    the process restarts, or by other processes using the same file.
+
+    This helps with Chinese, Japanese, and Korean, whose tokenizers take much
+    longer than looking up the tokens does. Other languages are tokenized
+    quickly enough that they aren't cached on disk, unless `all_languages` is
+    True. The in-memory cache is still checked first.
+
+    The file keeps at most about `max_entries` entries, dropping the oldest
+    ones first. If `snapshot` is given, the cache is filled from that file,
+    which can be made with `DiskCache.snapshot`. Entries stored by a different
+    version of wordfreq, its data, or the tokenizers are ignored.
+
+    Returns the `DiskCache`, which is closed by `disable_disk_cache` or when
+    the process exits.
+    """
+    global _disk_cache, _disk_cache_all_languages
+    disable_disk_cache()
+    cache = DiskCache(path, max_entries)
+    if snapshot is not None:
+        cache.warm(snapshot)
+    _disk_cache = cache
+    _disk_cache_all_languages = all_languages
+    return cache
+
+
+def disable_disk_cache() -> None:
+    """
+    Stop using the disk cache set up by `enable_disk_cache`, writing out any
+    results it hasn't written yet.
+    """
+    global _disk_cache
+    if _disk_cache is not None:
+        _disk_cache.close()
+        _disk_cache = None
+
+
+atexit.register(disable_disk_cache)
+
+
+def enable_sqlite_backend(path: str | os.PathLike, pool_size: int = 4) -> SQLiteBackend:
+    """
+    Look up frequencies in a database made by `export_sqlite`, instead of
+    loading wordlists into memory. This is for processes that don't have
+    the memory to spare for the wordlists they need.
+
+    This applies to `word_frequency`, `zipf_frequency`, `word_cB`, and the
+    `token_` functions. Looking up text that has many tokens queries all of
+    them at once, and the caches of recent results still apply. Functions
+    that work with whole wordlists, such as `top_n_list`, still load them.
+
+    Returns the `SQLiteBackend`, which keeps a pool of up to `pool_size`
+    read-only connections to the database.
+    """
+    global _sqlite_backend
+    disable_sqlite_backend()
+    backend = SQLiteBackend(path, pool_size)
+    _extend_band_entries(backend.max_band + 1)
+    _freq_cache.clear()
+    _sqlite_backend = backend
+    return backend
+
+
+def disable_sqlite_backend() -> None:
+    """
+    Go back to looking up frequencies in the wordlists in memory, after
+    `enable_sqlite_backend`.
+    """
+    global _sqlite_backend
+    if _sqlite_backend is not None:
+        _sqlite_backend.close()
+        _sqlite_backend = None
+        _freq_cache.clear()
+
+
+def set_frequency_cutoff(min_zipf: float | None = None, max_words: int | None = None) -> None:
+    """
+    Load only the most frequent words of each wordlist for looking up
+    frequencies, to save memory when you only care about common words. This
+    applies to `word_frequency`, `zipf_frequency`, `word_cB`, and the
+    `token_` functions.
+
+    `min_zipf` keeps the words whose Zipf frequency is at least `min_zipf`.
+    `max_words` keeps as many of the most frequent words as it can without
+    going over `max_words`, stopping at the end of a band of words that have
+    the same frequency. The wordlists are only decoded as far as the cutoff.
+
+    Words below the cutoff are looked up as if they weren't in the wordlist,
+    so they get the `minimum` value, which defaults to 0. Text containing one
+    of them gets `minimum` as well.
+
+    Functions that work with whole wordlists, such as `top_n_list`, aren't
+    affected. Calling this with no arguments goes back to the whole wordlists.
+    """
+    global _frequency_cutoff
+    _frequency_cutoff = _cutoff_args(min_zipf, max_words)
+    _surface_form_table.cache_clear()
+    _freq_cache.clear()
+
+
+def prepare_for_fork(languages: Iterable[str] = (), wordlist: str = "best") -> None:
+    """
+    Get ready to fork worker processes that share the memory of this one, as
+    a pre-forking server such as gunicorn with `--preload` does.
+
+    This loads the wordlists and tokenizers for `languages`, so the workers
+    don't each load their own copies, and then uses `gc.freeze()` to exempt
+    everything loaded so far from garbage collection. Otherwise, each garbage
+    collection in a worker writes to every object it examines, which gradually
+    gives each worker a private copy of memory that could have been shared.
+
+    Looking up words doesn't change anything about the strings in a wordlist,
+    so after this, lookups leave the shared memory alone. Functions that
+    return many words from a wordlist, such as `iter_wordlist`, still update
+    the reference counts of those words, which copies the memory they're in.
+    """
+    for lang in languages:
+        get_cB_dict(lang, wordlist, **_frequency_cutoff)
+        _surface_form_table(lang, wordlist)
+        # Load the tokenizer, and anything it loads on first use
+        lossy_tokenize("preload", lang)
+    gc.collect()
+    gc.freeze()
 
 
 def zipf_frequency(word: str, lang: str, wordlist: str = "best", minimum: float = 0.0) -> float:
@@ -330,11 +1011,693 @@ def zipf_frequency(word: str, lang: str, wordlist: str = "best", minimum: float
     the nearest hundredth to match this quantization.
     """
     freq_min = zipf_to_freq(minimum)
-    freq = word_frequency(word, lang, wordlist, freq_min)
+    entry = _cached_frequency(word, lang, wordlist)
+    if entry is not None and entry[0] >= freq_min:
+        return cB_to_zipf(entry[2])
+    freq = _apply_minimum(entry, freq_min)
     return round(freq_to_zipf(freq), 2)
 
 
-@lru_cache(maxsize=100)
+def word_cB(word: str, lang: str, wordlist: str = "best", minimum: int = -900) -> int:
+    """
+    Get the frequency of `word`, in the language with code `lang`, in whole
+    centibels (see `cB_to_freq`). This is the quantized value that
+    `zipf_frequency` converts to the Zipf scale: `cB_to_zipf(word_cB(...))`
+    is the same as `zipf_frequency(...)` with the corresponding minimum.
+
+    The value will be at least `minimum`, even for a word that never
+    appears. The default of -900 cB is 0 on the Zipf scale, representing
+    words that appear once per billion words or less.
+
+    Frequencies are already stored as centibels, so when `word` is a single
+    token that doesn't need to be estimated from its parts, this does no
+    floating-point work at all.
+    """
+    entry = _cached_frequency(word, lang, wordlist)
+    if entry is None:
+        return minimum
+    return max(entry[2], minimum)
+
+
+def word_cBs(
+    words: Iterable[str], lang: str, wordlist: str = "best", minimum: int = -900
+) -> list[int]:
+    """
+    Get the frequencies of many words at once, in centibels, in a list that
+    matches the order of `words`. See `word_cB`.
+    """
+    return [word_cB(word, lang, wordlist, minimum) for word in words]
+
+
+def _check_token(token: str, lang: str) -> None:
+    if lossy_tokenize(token, lang) != [token]:
+        raise ValueError(
+            f"{token!r} is not a single normalized token in {lang!r}. "
+            "Use `word_frequency` to look up text that needs tokenizing."
+        )
+
+
+def token_frequency(
+    token: str, lang: str, wordlist: str = "best", minimum: float = 0.0, strict: bool = False
+) -> float:
+    """
+    Get the frequency of a token that is already in the form wordfreq looks
+    up, the way `lossy_tokenize` would output it: case-folded, normalized,
+    and with straight apostrophes.
+
+    This skips tokenization, so it's much faster than `word_frequency` if
+    you've tokenized your text already. It gives the same result that
+    `word_frequency` would give for the token. A token that isn't normalized
+    will probably just not be found; set `strict` to True to check the token
+    and raise a ValueError if it isn't normalized.
+    """
+    if strict:
+        _check_token(token, lang)
+    return _apply_minimum(_lookup_token(token, _token_cB_dict([token], lang, wordlist)), minimum)
+
+
+def token_frequencies(
+    tokens: Iterable[str],
+    lang: str,
+    wordlist: str = "best",
+    minimum: float = 0.0,
+    strict: bool = False,
+) -> list[float]:
+    """
+    Get the frequencies of many normalized tokens at once, in a list that
+    matches the order of `tokens`. See `token_frequency`.
+    """
+    tokens = list(tokens)
+    cBs = _token_cB_dict(tokens, lang, wordlist)
+    results = []
+    for token in tokens:
+        if strict:
+            _check_token(token, lang)
+        results.append(_apply_minimum(_lookup_token(token, cBs), minimum))
+    return results
+
+
+def token_cB(
+    token: str, lang: str, wordlist: str = "best", minimum: int = -900, strict: bool = False
+) -> int:
+    """
+    Get the frequency of a normalized token in whole centibels, the way
+    `word_cB` would for the token, while skipping tokenization like
+    `token_frequency` does.
+    """
+    return token_cBs([token], lang, wordlist, minimum, strict)[0]
+
+
+def token_cBs(
+    tokens: Iterable[str],
+    lang: str,
+    wordlist: str = "best",
+    minimum: int = -900,
+    strict: bool = False,
+) -> list[int]:
+    """
+    Get the frequencies of many normalized tokens at once, in centibels, in a
+    list that matches the order of `tokens`. See `token_cB`.
+    """
+    tokens = list(tokens)
+    cBs = _token_cB_dict(tokens, lang, wordlist)
+    results = []
+    for token in tokens:
+        if strict:
+            _check_token(token, lang)
+        smashed = smash_numbers(token)
+        cB = cBs.get(smashed)
+        if cB is None:
+            results.append(minimum)
+        elif smashed != token:
+            results.append(max(_band_entry(cB, token, smashed)[2], minimum))
+        else:
+            results.append(max(cB, minimum))
+    return results
+
+
+class WordRange(Sequence[str]):
+    """
+    A sequence of consecutive words from a wordlist, in descending order of
+    frequency, such as the result of `words_in_range`.
+
+    A WordRange refers to the words in the cached wordlist instead of copying
+    them, so it takes constant time and space to make one, or to take a slice
+    of it. Use `list()` on it if you need a list.
+    """
+
+    __slots__ = ("_positions", "_start", "_stop", "_words")
+
+    def __init__(
+        self, words: list[str], positions: array[int] | None, start: int, stop: int
+    ) -> None:
+        self._words = words
+        self._positions = positions
+        self._start = start
+        self._stop = stop
+
+    def __len__(self) -> int:
+        """
+        Get the number of words in the range.
+        """
+        return self._stop - self._start
+
+    @overload
+    def __getitem__(self, index: int) -> str: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> Sequence[str]: ...
+
+    def __getitem__(self, index: int | slice) -> str | Sequence[str]:
+        """
+        Get a word by its index in the range, or a slice of the range. Slices
+        with a step of 1 are WordRanges themselves.
+        """
+        length = self._stop - self._start
+        if isinstance(index, slice):
+            start, stop, step = index.indices(length)
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            stop = max(start, stop)
+            return WordRange(self._words, self._positions, self._start + start, self._start + stop)
+
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("WordRange index out of range")
+        pos = self._start + index
+        if self._positions is not None:
+            pos = self._positions[pos]
+        return self._words[pos]
+
+    def __iter__(self) -> Iterator[str]:
+        """
+        Iterate over the words in the range.
+        """
+        if self._positions is None:
+            return itertools.islice(self._words, self._start, self._stop)
+        words = self._words
+        return (words[pos] for pos in self._positions[self._start : self._stop])
+
+    def __repr__(self) -> str:
+        """
+        Show the length of the range and a few of its words.
+        """
+        words = ", ".join(repr(word) for word in itertools.islice(self, 5))
+        if len(self) > 5:
+            words += ", ..."
+        return f"<WordRange of {len(self)} words: {words}>"
+
+
+def words_in_range(
+    lang: str,
+    zipf_min: float,
+    zipf_max: float,
+    wordlist: str = "best",
+    ascii_only: bool = False,
+    include_digits: bool = True,
+) -> WordRange:
+    """
+    Get the words whose frequency on the Zipf scale is between `zipf_min` and
+    `zipf_max`, inclusive, in descending order of frequency.
+
+    If `ascii_only` is True, only words written in ASCII characters are
+    included. If `include_digits` is False, words containing multi-digit
+    sequences are left out, as they are in `top_n_list`.
+
+    The result is a `WordRange`, which refers to the wordlist without copying
+    it. The filtered positions are computed once per wordlist and cached.
+    """
+    offsets = _band_offsets(lang, wordlist)
+    words = _word_array(lang, wordlist)
+
+    # Centibel band i holds the words at Zipf value (900 - i) / 100. Round
+    # before taking the ceiling or floor, so that floating-point error doesn't
+    # push a bound like 3.5 into the next band.
+    first_band = max(math.ceil(round(900 - 100 * zipf_max, 6)), 0)
+    last_band = min(math.floor(round(900 - 100 * zipf_min, 6)), len(offsets) - 2)
+    if first_band > last_band:
+        return WordRange(words, None, 0, 0)
+
+    start = offsets[first_band]
+    stop = offsets[last_band + 1]
+    if not ascii_only and include_digits:
+        return WordRange(words, None, start, stop)
+
+    positions = _filtered_positions(lang, wordlist, ascii_only, include_digits)
+    return WordRange(
+        words,
+        positions,
+        bisect.bisect_left(positions, start),
+        bisect.bisect_left(positions, stop),
+    )
+
+
+def frequencies_across_languages(word: str, wordlist: str = "best") -> dict[str, float]:
+    """
+    Get the frequency of a token in every language it appears in, using the
+    index from `get_combined_index`. Returns a dictionary from language codes
+    to frequencies, leaving out the languages where the token isn't found.
+
+    Languages differ in how they normalize text, so there's no single way to
+    tokenize a word for all of them. Like `token_frequency`, this looks up
+    the token as given, and expects it to be normalized already: case-folded,
+    and with straight apostrophes. Each frequency is the same as what
+    `token_frequency` would return for that language.
+    """
+    index = get_combined_index(wordlist)
+    smashed = smash_numbers(word)
+    lookups = index.lookup(smashed)
+    _extend_band_entries(max((band + 1 for _lang, band in lookups), default=0))
+    return {lang: _band_entry(-band, word, smashed)[1] for lang, band in lookups}
+
+
+def word_rank(word: str, lang: str, wordlist: str = "best") -> int | None:
+    """
+    Get the position of `word` in the wordlist, in the order that
+    `iter_wordlist` yields the words: the most frequent word is at 0, the
+    next at 1, and so on.
+
+    Words with the same rounded frequency get consecutive ranks in
+    alphabetical order, so comparing ranks breaks ties between them
+    consistently.
+
+    The word is normalized the same way as in `word_frequency`. Returns None
+    if it isn't a single token in the wordlist, such as an unknown word, a
+    phrase, or a number whose frequency is estimated.
+    """
+    tokens = _cached_tokens(word, lang)
+    if len(tokens) != 1:
+        return None
+    return _rank_dict(lang, wordlist).get(tokens[0])
+
+
+def sort_by_frequency(words: Iterable[str], lang: str, wordlist: str = "best") -> list[str]:
+    """
+    Sort a list of words from the most frequent to the least frequent.
+
+    Words in the same centibel band are sorted by `word_rank`. Phrases and
+    numbers, whose frequencies are estimated, go after the words in their
+    band, and words with no frequency go at the end. Words that would be tied
+    stay in the order they were given.
+    """
+    ranks = _rank_dict(lang, wordlist)
+    offsets = _band_offsets(lang, wordlist)
+
+    def sort_key(word: str) -> tuple[float, float]:
+        tokens = _cached_tokens(word, lang)
+        if len(tokens) == 1:
+            rank = ranks.get(tokens[0])
+            if rank is not None:
+                return bisect.bisect_right(offsets, rank) - 1, rank
+        entry = _cached_frequency(word, lang, wordlist)
+        if entry is None or entry[0] == 0.0:
+            return math.inf, math.inf
+        return round(-100 * math.log10(entry[0])), math.inf
+
+    return sorted(words, key=sort_key)
+
+
+@lru_cache(maxsize=None)
+def _prefix_index(lang: str, wordlist: str) -> tuple[list[str], array[int], dict[str, list[str]]]:
+    """
+    Build the index that `complete` uses for a wordlist. It contains:
+
+    - The words of the wordlist, sorted alphabetically, so that the words
+      starting with a prefix are a range that can be found by bisection
+    - The rank of each of those words, in the same order
+    - A dictionary from each prefix that matches more than
+      COMPLETE_SCAN_SIZE words to its COMPLETE_TOP_K most frequent
+      completions
+    """
+    by_rank = _word_array(lang, wordlist)
+    entries = sorted(_rank_dict(lang, wordlist).items())
+    words = [word for word, _rank in entries]
+    ranks = array("l", [rank for _word, rank in entries])
+
+    top: dict[str, list[str]] = {}
+    stack = [("", 0, len(words))]
+    while stack:
+        prefix, lo, hi = stack.pop()
+        top[prefix] = [by_rank[rank] for rank in sorted(ranks[lo:hi])[:COMPLETE_TOP_K]]
+
+        # Split the range by the next character after the prefix, and index
+        # the parts that are still too big to scan
+        depth = len(prefix)
+        start = lo + 1 if words[lo] == prefix else lo
+        while start < hi:
+            next_char = words[start][depth]
+            end = bisect.bisect_left(words, prefix + chr(ord(next_char) + 1), start, hi)
+            if end - start > COMPLETE_SCAN_SIZE:
+                stack.append((prefix + next_char, start, end))
+            start = end
+    return words, ranks, top
+
+
+def complete(prefix: str, lang: str, k: int = 10, wordlist: str = "best") -> list[str]:
+    """
+    Get the `k` most frequent words in the wordlist that start with `prefix`,
+    in descending order of frequency, for purposes such as autocompletion.
+
+    The prefix is normalized in the same way as the words in the wordlist,
+    with `lossy_normalize`, so for example 'Don’' will be completed with
+    "don't". The index this uses is built the first time it's needed for
+    each wordlist.
+    """
+    prefix = lossy_normalize(prefix, lang)
+    words, ranks, top = _prefix_index(lang, wordlist)
+    if k <= COMPLETE_TOP_K:
+        found = top.get(prefix)
+        if found is not None:
+            return found[:k]
+
+    lo = bisect.bisect_left(words, prefix)
+    if prefix:
+        hi = bisect.bisect_left(words, prefix[:-1] + chr(ord(prefix[-1]) + 1), lo)
+    else:
+        hi = len(words)
+    by_rank = _word_array(lang, wordlist)
+    return [by_rank[rank] for rank in sorted(ranks[lo:hi])[:k]]
+
+
+def _deletes(word: str, max_distance: int) -> set[str]:
+    """
+    Get all the strings that can be made by deleting up to `max_distance`
+    characters from `word`, including `word` itself.
+    """
+    results = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        frontier = {text[:i] + text[i + 1 :] for text in frontier for i in range(len(text))}
+        results |= frontier
+    return results
+
+
+def _edit_distance(a: str, b: str, max_distance: int) -> int:
+    """
+    Get the number of insertions, deletions, substitutions, and swaps of
+    adjacent characters it takes to turn `a` into `b`. Stops early and
+    returns `max_distance + 1` if it's more than `max_distance`.
+    """
+    too_far = max_distance + 1
+    if abs(len(a) - len(b)) > max_distance:
+        return too_far
+
+    # A prefix or suffix that the strings share doesn't change the distance
+    start = 0
+    shortest = min(len(a), len(b))
+    while start < shortest and a[start] == b[start]:
+        start += 1
+    end = 0
+    while end < shortest - start and a[-1 - end] == b[-1 - end]:
+        end += 1
+    a = a[start : len(a) - end]
+    b = b[start : len(b) - end]
+    if not a or not b:
+        return min(len(a) + len(b), too_far)
+
+    before_prev: list[int] = []
+    prev = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        row_min = i
+        for j, char_b in enumerate(b, 1):
+            if char_a == char_b:
+                value = prev[j - 1]
+            else:
+                value = prev[j - 1] + 1
+                if prev[j] < value:
+                    value = prev[j] + 1
+                if current[j - 1] < value:
+                    value = current[j - 1] + 1
+                if (
+                    i > 1
+                    and j > 1
+                    and char_a == b[j - 2]
+                    and a[i - 2] == char_b
+                    and before_prev[j - 2] < value
+                ):
+                    value = before_prev[j - 2] + 1
+            current.append(value)
+            if value < row_min:
+                row_min = value
+        if row_min > max_distance:
+            return too_far
+        before_prev, prev = prev, current
+    return min(prev[-1], too_far)
+
+
+@lru_cache(maxsize=None)
+def _suggestion_index(
+    lang: str, wordlist: str, max_distance: int, top_n: int | None
+) -> dict[str, int | list[int]]:
+    """
+    Build the index that `suggest` uses, for the "symmetric delete" method of
+    finding words within an edit distance. It maps each string that can be
+    made by deleting up to `max_distance` characters from the start of a word
+    to the rank of that word, or to a list of ranks if there's more than one.
+    """
+    index: dict[str, int | list[int]] = {}
+    for rank, word in enumerate(_word_array(lang, wordlist)[:top_n]):
+        if has_digit_sequence(word):
+            continue
+        for delete in _deletes(word[:SUGGEST_PREFIX_LENGTH], max_distance):
+            found = index.get(delete)
+            if found is None:
+                index[delete] = rank
+            elif isinstance(found, int):
+                index[delete] = [found, rank]
+            else:
+                found.append(rank)
+    return index
+
+
+def suggest(
+    word: str,
+    lang: str,
+    max_distance: int = 2,
+    k: int = 5,
+    wordlist: str = "best",
+    top_n: int | None = SUGGEST_WORDS,
+) -> list[str]:
+    """
+    Suggest up to `k` known words that are within `max_distance` edits of
+    `word`, such as corrections for a misspelled word. An edit is inserting,
+    deleting, or changing a character, or swapping two adjacent characters.
+
+    The suggestions are sorted by their edit distance, with more frequent
+    words first among words at the same distance. A word that's already in
+    the wordlist will be its own first suggestion.
+
+    The word is normalized with `lossy_normalize` first, so suggestions follow
+    the same normalization as the wordlist.
+
+    Only the `top_n` most frequent words in the wordlist are suggested; set
+    it to None to use all of them. The index of these words is built the
+    first time it's needed and cached, and it takes more memory for larger
+    values of `top_n` and `max_distance`.
+    """
+    word = lossy_normalize(word, lang)
+    index = _suggestion_index(lang, wordlist, max_distance, top_n)
+    by_rank = _word_array(lang, wordlist)
+
+    distances: dict[int, int] = {}
+    for delete in _deletes(word[:SUGGEST_PREFIX_LENGTH], max_distance):
+        found = index.get(delete)
+        if found is None:
+            continue
+        for rank in [found] if isinstance(found, int) else found:
+            if rank not in distances:
+                distances[rank] = _edit_distance(word, by_rank[rank], max_distance)
+
+    matches = sorted(
+        (distance, rank) for rank, distance in distances.items() if distance <= max_distance
+    )
+    return [by_rank[rank] for _distance, rank in matches[:k]]
+
+
+@lru_cache(maxsize=None)
+def _pattern_index(
+    lang: str, wordlist: str
+) -> tuple[
+    dict[int, array[int]],
+    dict[tuple[int, str], array[int]],
+    dict[tuple[int, str], array[int]],
+    dict[str, array[int]],
+]:
+    """
+    Build the indexes that `match_pattern` uses for a wordlist. Each one maps
+    a property of words to an array of the ranks of the words that have it,
+    in increasing order:
+
+    - the length of the word
+    - (i, char), for a character that appears i characters from the start
+    - (i, char), for a character that appears i characters from the end
+    - a character that appears anywhere in the word
+
+    Characters are indexed at up to PATTERN_POSITIONS positions from each
+    end. Words containing multi-digit sequences are left out.
+    """
+    lengths: dict[int, array[int]] = defaultdict(lambda: array("I"))
+    starts: dict[tuple[int, str], array[int]] = defaultdict(lambda: array("I"))
+    ends: dict[tuple[int, str], array[int]] = defaultdict(lambda: array("I"))
+    contains: dict[str, array[int]] = defaultdict(lambda: array("I"))
+    for rank, word in enumerate(_word_array(lang, wordlist)):
+        if has_digit_sequence(word):
+            continue
+        lengths[len(word)].append(rank)
+        for key in enumerate(word[:PATTERN_POSITIONS]):
+            starts[key].append(rank)
+        for key in enumerate(word[: -PATTERN_POSITIONS - 1 : -1]):
+            ends[key].append(rank)
+        for char in set(word):
+            contains[char].append(rank)
+    return dict(lengths), dict(starts), dict(ends), dict(contains)
+
+
+def match_pattern(pattern: str, lang: str, k: int = 10, wordlist: str = "best") -> list[str]:
+    """
+    Get the `k` most frequent words that match a wildcard pattern, in
+    descending order of frequency. In the pattern, `?` matches any one
+    character, and `*` matches any number of characters, including none.
+    For example, `c?t*` matches 'cat', 'city', and 'cutting', and `?a???`
+    matches five-letter words whose second letter is 'a'.
+
+    The pattern is normalized in the same way as the words in the wordlist.
+    Words that contain multi-digit sequences never match.
+    """
+    pattern = lossy_normalize(pattern, lang)
+    lengths, starts, ends, contains = _pattern_index(lang, wordlist)
+    by_rank = _word_array(lang, wordlist)
+    parts = pattern.split("*")
+
+    # Find the arrays of ranks that every match must be in
+    no_ranks: array[int] = array("I")
+    candidates: list[array[int]] = []
+    if len(parts) == 1:
+        candidates.append(lengths.get(len(pattern), no_ranks))
+        head = tail = pattern
+    else:
+        head, tail = parts[0], parts[-1]
+    for index, chars in ((starts, head), (ends, tail[::-1])):
+        for key in enumerate(chars[:PATTERN_POSITIONS]):
+            if key[1] != "?":
+                candidates.append(index.get(key, no_ranks))
+    for char in set(pattern) - {"?", "*"}:
+        candidates.append(contains.get(char, no_ranks))
+
+    # Go through the shortest of these lists in order of frequency, or
+    # through the whole wordlist if the pattern doesn't narrow it down
+    ranks: Iterable[int] = range(len(by_rank))
+    if candidates:
+        shortest: array[int] = min(candidates, key=len)
+        ranks = shortest
+    expr = regex.compile(
+        ".*".join(".".join(regex.escape(piece) for piece in part.split("?")) for part in parts),
+        regex.DOTALL,
+    )
+    results: list[str] = []
+    for rank in ranks:
+        if len(results) >= k:
+            break
+        word = by_rank[rank]
+        if expr.fullmatch(word) and not has_digit_sequence(word):
+            results.append(word)
+    return results
+
+
+def score_languages(
+    text: str,
+    candidates: Iterable[str],
+    wordlist: str = "best",
+    minimum: float = 1e-9,
+    margin: float | None = None,
+) -> dict[str, float]:
+    """
+    Score how likely it is that `text` is in each of the `candidates`
+    languages, to guess which language it's in.
+
+    Each score is the natural log of the probability of the text's tokens in
+    that language, treating the tokens as independent. Higher scores are
+    better. The result is a dictionary from each candidate to its score, with
+    the best candidate first.
+
+    A token that isn't in a language's wordlist gets a frequency of `minimum`
+    for each character in it. Otherwise, a language whose tokenizer fails to
+    split up text, such as a Chinese sentence given to an English tokenizer,
+    would get only one penalty for the whole thing.
+
+    The text is tokenized once for each group of candidates that tokenize
+    text in the same way, such as most languages written in the Latin
+    alphabet. If the index from `get_combined_index` has been made, each
+    token is looked up once in it for all the candidates, so this doesn't
+    load each candidate's wordlist. Otherwise, it loads their wordlists.
+
+    If `margin` is given, this stops looking at more tokens once the best
+    candidate's score is ahead of every other candidate's by at least that
+    much. The scores then only count the tokens seen so far.
+    """
+    candidates = list(dict.fromkeys(candidates))
+    token_lists: dict[tuple, list[str]] = {}
+    lang_tokens = []
+    for lang in candidates:
+        family = _tokenizer_family(lang)
+        if family not in token_lists:
+            token_lists[family] = lossy_tokenize(text, lang)
+        lang_tokens.append(token_lists[family])
+
+    combined: CombinedIndex | None = None
+    try:
+        combined = get_combined_index(wordlist)
+    except FileNotFoundError:
+        pass
+    except ValueError as err:
+        logger.warning(f"Not using the combined index: {err}")
+
+    cB_dicts = []
+    index_langs = []
+    if combined is None:
+        cB_dicts = [get_cB_dict(lang, wordlist) for lang in candidates]
+    else:
+        for lang in candidates:
+            match, _distance = langcodes.closest_match(lang, combined.languages, max_distance=60)
+            if match == "und":
+                raise LookupError(f"No wordlist {wordlist!r} available for language {lang!r}")
+            index_langs.append(match)
+
+    # The bands that each token appears in, by language
+    found: dict[str, dict[str, int]] = {}
+    scores = [0.0] * len(candidates)
+    log_minimum = math.log(minimum)
+    longest = max((len(tokens) for tokens in token_lists.values()), default=0)
+    for position in range(longest):
+        for index, tokens in enumerate(lang_tokens):
+            if position < len(tokens):
+                token = tokens[position]
+                if combined is None:
+                    entry = _lookup_token(token, cB_dicts[index])
+                else:
+                    smashed = smash_numbers(token)
+                    if smashed not in found:
+                        bands = dict(combined.lookup(smashed))
+                        _extend_band_entries(max(bands.values(), default=-1) + 1)
+                        found[smashed] = bands
+                    band = found[smashed].get(index_langs[index])
+                    entry = None if band is None else _band_entry(-band, token, smashed)
+                if entry is None or entry[0] < minimum:
+                    scores[index] += log_minimum * len(tokens[position])
+                else:
+                    scores[index] += math.log(entry[0])
+
+        if margin is not None and len(scores) > 1:
+            best, runner_up = heapq.nlargest(2, scores)
+            if best - runner_up >= margin:
+                break
+
+    ranked = sorted(zip(candidates, scores), key=lambda item: item[1], reverse=True)
+    return dict(ranked)
+
+
 def top_n_list(lang: str, n: int, wordlist: str = "best", ascii_only: bool = False) -> list[str]:
     """
     Return a frequency list of length `n` in descending order of frequency.
@@ -345,13 +1708,155 @@ def top_n_list(lang: str, n: int, wordlist: str = "best", ascii_only: bool = Fal
     estimate the frequencies of those using the functions in `numbers.py`,
     not using a wordlist that contains all of them.
     """
+    if n <= 0:
+        return []
+    if n <= TOP_N_SCAN_SIZE:
+        return _scan_top_words(lang, n, wordlist, ascii_only)
+    words = _word_array(lang, wordlist)
+    positions = _filtered_positions(lang, wordlist, ascii_only, False)
+    return [words[pos] for pos in positions[:n]]
+
+
+def _scan_top_words(lang: str, n: int, wordlist: str, ascii_only: bool) -> list[str]:
+    """
+    Find the `n` most frequent words that `top_n_list` would return by
+    scanning from the start of `iter_wordlist`, which is faster than
+    filtering the whole wordlist when `n` is small.
+    """
     results = []
     for word in iter_wordlist(lang, wordlist):
-        if (not ascii_only) or max(word) <= "~":
-            if not has_digit_sequence(word):
-                results.append(word)
-                if len(results) >= n:
-                    break
+        if (not ascii_only or max(word) <= "~") and not has_digit_sequence(word):
+            results.append(word)
+            if len(results) >= n:
+                break
+    return results
+
+
+@lru_cache(maxsize=None)
+def _random_word_choices(lang: str, n: int, wordlist: str, ascii_only: bool) -> tuple[str, ...]:
+    """
+    Get the words that `random_words` chooses from, for a small number of
+    choices. Larger numbers of choices are sliced from `_filtered_positions`.
+    """
+    return tuple(_scan_top_words(lang, n, wordlist, ascii_only))
+
+
+def _alias_table(weights: list[float]) -> tuple[list[float], list[int]]:
+    """
+    Build an alias table for choosing among outcomes with the given weights
+    in constant time, using Vose's method.
+
+    To choose an outcome, pick a column `i` uniformly at random, and a
+    uniform random number `x` between 0 and 1. The outcome is `i` if `x` is
+    less than `probs[i]`, and `aliases[i]` otherwise.
+    """
+    n = len(weights)
+    total = sum(weights)
+    scaled = [weight * n / total for weight in weights]
+    probs = [1.0] * n
+    aliases = list(range(n))
+    small = [i for i, value in enumerate(scaled) if value < 1.0]
+    large = [i for i, value in enumerate(scaled) if value >= 1.0]
+    while small and large:
+        less = small.pop()
+        more = large.pop()
+        probs[less] = scaled[less]
+        aliases[less] = more
+        scaled[more] += scaled[less] - 1.0
+        if scaled[more] < 1.0:
+            small.append(more)
+        else:
+            large.append(more)
+    # Whatever is left over has a probability of 1, up to rounding error
+    return probs, aliases
+
+
+@lru_cache(maxsize=None)
+def _sampling_table(
+    lang: str, wordlist: str, ascii_only: bool, include_digits: bool
+) -> tuple[array[int] | None, list[int], list[int], list[float], list[int]]:
+    """
+    Build the table that `sample` uses to draw words in proportion to their
+    frequency. All the words in a centibel band are equally likely, so this
+    is an alias table over the bands, weighted by their total frequency, and
+    the word within the band is drawn uniformly.
+
+    Returns the filtered positions of the candidate words in `_word_array`
+    (or None if every word is a candidate), and for each band that has any
+    candidates: its start among the candidates, its size, and its alias
+    table entries.
+    """
+    offsets = _band_offsets(lang, wordlist)
+    positions: array[int] | None = None
+    if ascii_only or not include_digits:
+        filtered = _filtered_positions(lang, wordlist, ascii_only, include_digits)
+        offsets = [bisect.bisect_left(filtered, offset) for offset in offsets]
+        positions = filtered
+
+    starts = []
+    sizes = []
+    weights = []
+    for index in range(len(offsets) - 1):
+        size = offsets[index + 1] - offsets[index]
+        if size:
+            starts.append(offsets[index])
+            sizes.append(size)
+            weights.append(size * cB_to_freq(-index))
+    if not weights:
+        raise ValueError("There are no words in the wordlist to sample from.")
+    probs, aliases = _alias_table(weights)
+    return positions, starts, sizes, probs, aliases
+
+
+# A source of random numbers for `sample` and `random_words` that's suitable
+# for making passphrases
+_secure_random = secrets.SystemRandom()
+
+
+def sample(
+    lang: str,
+    n: int,
+    wordlist: str = "best",
+    ascii_only: bool = False,
+    include_digits: bool = False,
+    rng: random.Random | None = None,
+    secure: bool = False,
+) -> list[str]:
+    """
+    Draw `n` words at random from a wordlist, in proportion to their
+    frequencies, like the words of a text in that language. Each draw takes
+    constant time.
+
+    As in `top_n_list`, words containing multi-digit sequences are left out
+    unless `include_digits` is True, and `ascii_only` restricts the words to
+    those written in ASCII characters.
+
+    The random numbers come from `rng`, a `random.Random` instance, if it's
+    given; otherwise from the `random` module, or from the `secrets` module
+    if `secure` is True.
+    """
+    words = _word_array(lang, wordlist)
+    positions, starts, sizes, probs, aliases = _sampling_table(
+        lang, wordlist, ascii_only, include_digits
+    )
+    if rng is not None:
+        rand = rng.random
+    elif secure:
+        rand = _secure_random.random
+    else:
+        rand = random.random
+    n_bands = len(probs)
+
+    results = []
+    for _ in range(n):
+        column = rand() * n_bands
+        band = int(column)
+        if column - band >= probs[band]:
+            band = aliases[band]
+        pos = starts[band] + int(rand() * sizes[band])
+        if positions is not None:
+            pos = positions[pos]
+        results.append(words[pos])
     return results
 
 
@@ -361,6 +1866,7 @@ def random_words(
     nwords: int = 5,
     bits_per_word: int = 12,
     ascii_only: bool = False,
+    secure: bool = False,
 ) -> str:
     """
     Returns a string of random, space separated words.
@@ -374,19 +1880,33 @@ def random_words(
 
     You can restrict the selection of words to those written in ASCII
     characters by setting `ascii_only` to True.
+
+    Set `secure` to True to choose the words using the `secrets` module,
+    which you should do if you're using them as a passphrase.
     """
     n_choices = 2**bits_per_word
-    choices = top_n_list(lang, n_choices, wordlist, ascii_only=ascii_only)
-    if len(choices) < n_choices:
-        raise ValueError(
-            "There aren't enough words in the wordlist to provide %d bits of "
-            "entropy per word." % bits_per_word
-        )
-    return " ".join([random.choice(choices) for i in range(nwords)])
+    randrange = _secure_random.randrange if secure else random.randrange
+    if n_choices <= RANDOM_WORDS_SCAN_SIZE:
+        choices = _random_word_choices(lang, n_choices, wordlist, ascii_only)
+        if len(choices) == n_choices:
+            return " ".join([choices[randrange(n_choices)] for i in range(nwords)])
+    else:
+        words = _word_array(lang, wordlist)
+        positions = _filtered_positions(lang, wordlist, ascii_only, False)
+        if len(positions) >= n_choices:
+            return " ".join([words[positions[randrange(n_choices)]] for i in range(nwords)])
+    raise ValueError(
+        "There aren't enough words in the wordlist to provide %d bits of "
+        "entropy per word." % bits_per_word
+    )
 
 
 def random_ascii_words(
-    lang: str = "en", wordlist: str = "best", nwords: int = 5, bits_per_word: int = 12
+    lang: str = "en",
+    wordlist: str = "best",
+    nwords: int = 5,
+    bits_per_word: int = 12,
+    secure: bool = False,
 ) -> str:
     """
     Returns a string of random, space separated, ASCII words.
@@ -397,5 +1917,7 @@ def random_ascii_words(
     `bits_per_word` determines the amount of entropy provided by each word;
     when it's higher, this function will choose from a larger list of
     words, some of which are more rare.
+
+    Set `secure` to True to choose the words using the `secrets` module.
     """
-    return random_words(lang, wordlist, nwords, bits_per_word, ascii_only=True)
+    return random_words(lang, wordlist, nwords, bits_per_word, ascii_only=True, secure=secure)
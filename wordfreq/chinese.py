@@ -10,15 +10,58 @@ from .util import data_path
 DICT_FILENAME = data_path("jieba_zh.txt")
 ORIG_DICT_FILENAME = data_path("jieba_zh_orig.txt")
 SIMP_MAP_FILENAME = data_path("_chinese_mapping.msgpack.gz")
-try:
-    SIMPLIFIED_MAP = msgpack.load(gzip.open(SIMP_MAP_FILENAME), raw=False, strict_map_key=False)
-except TypeError:
-    # work around incompatibility between pure-Python msgpack and C msgpack
-    SIMPLIFIED_MAP = msgpack.load(gzip.open(SIMP_MAP_FILENAME), raw=False)
+
+# The mapping from Traditional to Simplified characters is loaded on demand,
+# along with the set of characters it would change. See `get_simplified_map`.
+_SIMPLIFIED_MAP: dict[int, str] | None = None
+_TRADITIONAL_CHARS: frozenset[str] = frozenset()
+
 jieba_tokenizer: jieba.Tokenizer | None = None
 jieba_orig_tokenizer: jieba.Tokenizer | None = None
 
 
+def _load_simplified_map() -> dict[int, str]:
+    with gzip.open(SIMP_MAP_FILENAME) as infile:
+        try:
+            return msgpack.load(infile, raw=False, strict_map_key=False)
+        except TypeError:
+            # work around incompatibility between pure-Python msgpack and C msgpack
+            infile.seek(0)
+            return msgpack.load(infile, raw=False)
+
+
+def get_simplified_map() -> dict[int, str]:
+    """
+    Get the table that maps Traditional Chinese codepoints to Simplified
+    Chinese characters, in the form that `str.translate` takes. The table is
+    read from disk the first time it's needed, not when this module is
+    imported.
+    """
+    global _SIMPLIFIED_MAP, _TRADITIONAL_CHARS
+    if _SIMPLIFIED_MAP is None:
+        simplified_map = _load_simplified_map()
+        _TRADITIONAL_CHARS = frozenset(chr(codept) for codept in simplified_map)
+        _SIMPLIFIED_MAP = simplified_map
+    return _SIMPLIFIED_MAP
+
+
+def __getattr__(name: str) -> dict[int, str]:
+    # SIMPLIFIED_MAP used to be loaded when this module was imported. Keep it
+    # available under its old name, without paying for it up front.
+    if name == "SIMPLIFIED_MAP":
+        return get_simplified_map()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def has_traditional(text: str) -> bool:
+    """
+    Determine whether this text contains any characters that
+    `simplify_chinese` would convert to Simplified Chinese.
+    """
+    get_simplified_map()
+    return not _TRADITIONAL_CHARS.isdisjoint(text)
+
+
 def simplify_chinese(text: str) -> str:
     """
     Convert Chinese text character-by-character to Simplified Chinese, for the
@@ -29,11 +72,20 @@ def simplify_chinese(text: str) -> str:
     not be simplified in context, or by simplifying words that would only be
     used in a Traditional Chinese locale. But the resulting text is still a
     reasonable key for looking up word frequenices.
+
+    Every character maps to exactly one character, so spans of the simplified
+    text line up with spans of the original text.
     """
-    return text.translate(SIMPLIFIED_MAP).casefold()
+    # Most text doesn't contain Traditional characters at all. Checking for
+    # them is faster than running the translation table over the text.
+    if has_traditional(text):
+        text = text.translate(get_simplified_map())
+    return text.casefold()
 
 
-def jieba_tokenize(text: str, external_wordlist: bool = False) -> list[str]:
+def jieba_tokenize(
+    text: str, external_wordlist: bool = False, simplify: bool = False
+) -> list[str]:
     """
     Tokenize the given text into tokens whose word frequencies can probably
     be looked up. This uses Jieba, a word-frequency-based tokenizer.
@@ -48,20 +100,34 @@ def jieba_tokenize(text: str, external_wordlist: bool = False) -> list[str]:
     independent of the data in wordfreq. These results will be better optimized
     for purposes that aren't looking up word frequencies, such as general-
     purpose tokenization, or collecting word frequencies in the first place.
+
+    If `simplify` is True, the tokens are returned in Simplified Chinese, as if
+    each one had been run through `simplify_chinese`. The text is simplified
+    only once, so this is faster than simplifying the tokens afterward.
     """
     global jieba_tokenizer, jieba_orig_tokenizer
     if external_wordlist:
         if jieba_orig_tokenizer is None:
             jieba_orig_tokenizer = jieba.Tokenizer(dictionary=ORIG_DICT_FILENAME)
-        return jieba_orig_tokenizer.lcut(text)
+        if not simplify:
+            return jieba_orig_tokenizer.lcut(text)
+
+        # Tokenize the original text, but return those spans from its
+        # Simplified Chinese version
+        simplified = simplify_chinese(text)
+        return [
+            simplified[start:end] for _token, start, end in jieba_orig_tokenizer.tokenize(text)
+        ]
     else:
         if jieba_tokenizer is None:
             jieba_tokenizer = jieba.Tokenizer(dictionary=DICT_FILENAME)
 
-        # Tokenize the Simplified Chinese version of the text, but return
+        # Tokenize the Simplified Chinese version of the text. The tokens
+        # Jieba gives us are already spans of that version; otherwise, return
         # those spans from the original text, even if it's in Traditional
         # Chinese
-        tokens = []
-        for _token, start, end in jieba_tokenizer.tokenize(simplify_chinese(text), HMM=False):
-            tokens.append(text[start:end])
-        return tokens
+        simplified = simplify_chinese(text)
+        spans = jieba_tokenizer.tokenize(simplified, HMM=False)
+        if simplify:
+            return [token for token, _start, _end in spans]
+        return [text[start:end] for _token, start, end in spans]
@@ -0,0 +1,370 @@
+"""
+The `wordfreq` command, for looking up word frequencies in shell pipelines.
+
+    wordfreq annotate --lang en --column 2 < words.tsv > annotated.tsv
+    wordfreq tokenize --lang fr < text.txt
+    wordfreq dump --lang de -n 1000
+    wordfreq build-index
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import io
+import json
+import multiprocessing
+import os
+import sys
+from collections import deque
+from typing import Callable, Iterable, Iterator, Sequence, TextIO, cast
+
+from wordfreq import (
+    _round_frequency,
+    cB_to_freq,
+    cB_to_zipf,
+    get_frequency_list,
+    save_combined_index,
+    tokenize,
+    word_cBs,
+    word_frequency,
+)
+
+# The number of rows that are looked up together, which is also the unit of
+# work given to each process
+DEFAULT_BATCH_SIZE = 2000
+
+SCALES = ["zipf", "freq", "cB"]
+
+
+def lookup(words: list[str | None], lang: str, wordlist: str, scale: str) -> list:
+    """
+    Look up a batch of words on the given scale. Missing words (None) stay
+    None, so that they can be written as empty fields.
+    """
+    present = [word for word in words if word is not None]
+    values: Sequence[float]
+    if scale == "freq":
+        values = [word_frequency(word, lang, wordlist) for word in present]
+    else:
+        cBs = word_cBs(present, lang, wordlist)
+        values = [cB_to_zipf(cB) for cB in cBs] if scale == "zipf" else cBs
+    results = iter(values)
+    return [None if word is None else next(results) for word in words]
+
+
+def lookup_tokens(lines: list[str], lang: str, wordlist: str, scale: str) -> list[list[tuple]]:
+    """
+    Tokenize a batch of lines of text, and get the list of each line's
+    tokens with their values.
+    """
+    token_lists = [tokenize(line, lang) for line in lines]
+    values = iter(
+        lookup([token for tokens in token_lists for token in tokens], lang, wordlist, scale)
+    )
+    return [[(token, next(values)) for token in tokens] for tokens in token_lists]
+
+
+def _batches(rows: Iterable, size: int) -> Iterator[list]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _map_batches(
+    func: Callable, batches: Iterable[tuple[list, list]], args: tuple, jobs: int
+) -> Iterator[tuple[list, list]]:
+    """
+    Take pairs of a batch of rows and the input for `func` from those rows,
+    and yield each batch with the result of `func(input, *args)`, in order.
+
+    With more than one job, a few batches at a time are handed out to a pool
+    of processes, so memory use stays constant no matter how long the input
+    is. (`Pool.imap` would read all of the input ahead of the workers.)
+    """
+    if jobs <= 1:
+        for batch, data in batches:
+            yield batch, func(data, *args)
+        return
+
+    with multiprocessing.Pool(jobs) as pool:
+        pending: deque = deque()
+        for batch, data in batches:
+            pending.append((batch, pool.apply_async(func, (data, *args))))
+            if len(pending) >= jobs * 2:
+                done, result = pending.popleft()
+                yield done, result.get()
+        while pending:
+            done, result = pending.popleft()
+            yield done, result.get()
+
+
+def _nonnegative_int(value: str) -> int:
+    """
+    Parse an argument that counts something, so it can't be negative.
+    """
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"{value!r} isn't an integer") from None
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"{value!r} is negative")
+    return number
+
+
+def _format_value(value: float | None) -> str:
+    return "" if value is None else str(value)
+
+
+def _field_index(column: str, header: list[str] | None) -> int:
+    """
+    Find a column given as a 1-based number, or as a name in the header row.
+    """
+    if column.isdigit():
+        if int(column) < 1:
+            raise SystemExit("Column numbers start at 1")
+        return int(column) - 1
+    if header is None:
+        raise SystemExit(f"Column {column!r} isn't a number, and there's no --header row")
+    try:
+        return header.index(column)
+    except ValueError:
+        raise SystemExit(f"There's no column named {column!r} in the header") from None
+
+
+def annotate_delimited(args: argparse.Namespace, infile: TextIO, outfile: TextIO) -> None:
+    """
+    Add a column of values to TSV or CSV input.
+    """
+    write_row: Callable[[list[str]], object]
+    if args.format == "csv":
+        reader: Iterator[list[str]] = csv.reader(infile)
+        write_row = csv.writer(outfile, lineterminator="\n").writerow
+    else:
+        reader = (line.rstrip("\r\n").split("\t") for line in infile)
+
+        def write_tsv_row(row: list[str]) -> None:
+            outfile.write("\t".join(row) + "\n")
+
+        write_row = write_tsv_row
+
+    header = None
+    if args.header:
+        header = next(reader, None)
+        if header is None:
+            return
+        write_row([*header, args.output_name or args.scale])
+    index = _field_index(args.column, header)
+
+    batches = (
+        (batch, [row[index] if index < len(row) else None for row in batch])
+        for batch in _batches(reader, args.batch_size)
+    )
+    lookup_args = (args.lang, args.wordlist, args.scale)
+    for batch, values in _map_batches(lookup, batches, lookup_args, args.jobs):
+        for row, value in zip(batch, values):
+            write_row([*row, _format_value(value)])
+
+
+def _read_jsonl(infile: TextIO) -> Iterator[dict]:
+    """
+    Read the objects from JSON Lines input, skipping blank lines, and exiting
+    with an error that says which line it's on if a line isn't an object.
+    """
+    for line_number, line in enumerate(infile, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as err:
+            raise SystemExit(f"Line {line_number} isn't valid JSON: {err}") from None
+        if not isinstance(record, dict):
+            raise SystemExit(f"Line {line_number} isn't a JSON object")
+        yield record
+
+
+def annotate_jsonl(args: argparse.Namespace, infile: TextIO, outfile: TextIO) -> None:
+    """
+    Add a field of values to each object in JSON Lines input.
+    """
+    field = args.column
+    output_name = args.output_name or args.scale
+    records = _read_jsonl(infile)
+
+    def get_word(record: dict) -> str | None:
+        word = record.get(field)
+        return word if isinstance(word, str) else None
+
+    batches = (
+        (batch, [get_word(record) for record in batch])
+        for batch in _batches(records, args.batch_size)
+    )
+    lookup_args = (args.lang, args.wordlist, args.scale)
+    for batch, values in _map_batches(lookup, batches, lookup_args, args.jobs):
+        for record, value in zip(batch, values):
+            record[output_name] = value
+            outfile.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def run_annotate(args: argparse.Namespace, infile: TextIO, outfile: TextIO) -> None:
+    """
+    Add frequencies to the rows of TSV, CSV, or JSON Lines input.
+    """
+    if args.format == "jsonl":
+        annotate_jsonl(args, infile, outfile)
+    else:
+        annotate_delimited(args, infile, outfile)
+
+
+def run_tokenize(args: argparse.Namespace, infile: TextIO, outfile: TextIO) -> None:
+    """
+    Tokenize each line of text, writing each token and its value on a line
+    of its own, with an empty line after the tokens of each input line.
+    """
+    lines = (line.rstrip("\r\n") for line in infile)
+    batches = ((batch, batch) for batch in _batches(lines, args.batch_size))
+    lookup_args = (args.lang, args.wordlist, args.scale)
+    for _batch, results in _map_batches(lookup_tokens, batches, lookup_args, args.jobs):
+        for tokens in results:
+            outfile.writelines(f"{token}\t{_format_value(value)}\n" for token, value in tokens)
+            outfile.write("\n")
+
+
+def run_dump(args: argparse.Namespace, infile: TextIO, outfile: TextIO) -> None:
+    """
+    Write the words of a wordlist and their values, from most to least
+    frequent.
+    """
+    remaining = args.n
+    for index, bucket in enumerate(get_frequency_list(args.lang, args.wordlist)):
+        if args.scale == "zipf":
+            value = str(cB_to_zipf(-index))
+        elif args.scale == "freq":
+            value = str(_round_frequency(cB_to_freq(-index), 0.0))
+        else:
+            value = str(-index)
+        if remaining is not None:
+            bucket = bucket[:remaining]
+            remaining -= len(bucket)
+        outfile.writelines(f"{word}\t{value}\n" for word in bucket)
+        if remaining == 0:
+            break
+
+
+def run_build_index(args: argparse.Namespace, infile: TextIO, outfile: TextIO) -> None:
+    """
+    Build the combined index of all languages that `frequencies_across_languages`
+    and `score_languages` use, and write the path it was saved to.
+    """
+    outfile.write(f"{save_combined_index(args.wordlist)}\n")
+
+
+def make_parser() -> argparse.ArgumentParser:
+    """
+    Make the parser for the arguments of the `wordfreq` command.
+    """
+    parser = argparse.ArgumentParser(
+        prog="wordfreq", description="Look up word frequencies in many languages."
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("-l", "--lang", required=True, help="the language code to look up")
+    common.add_argument(
+        "-w", "--wordlist", default="best", help="the wordlist to use: 'best', 'large', or 'small'"
+    )
+    common.add_argument(
+        "-s",
+        "--scale",
+        choices=SCALES,
+        default="zipf",
+        help="output Zipf values, frequencies, or centibels (default: zipf)",
+    )
+
+    parallel = argparse.ArgumentParser(add_help=False)
+    parallel.add_argument(
+        "-j",
+        "--jobs",
+        type=_nonnegative_int,
+        default=1,
+        help="the number of processes to look up words in (0 means one per CPU)",
+    )
+    parallel.add_argument(
+        "--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help=argparse.SUPPRESS
+    )
+
+    annotate = subparsers.add_parser(
+        "annotate",
+        parents=[common, parallel],
+        help="add a column of frequencies to TSV, CSV, or JSON Lines on stdin",
+    )
+    annotate.add_argument(
+        "-f", "--format", choices=["tsv", "csv", "jsonl"], default="tsv", help="the input format"
+    )
+    annotate.add_argument(
+        "-c",
+        "--column",
+        default="1",
+        help="the column containing words, as a 1-based number or a header name, "
+        "or the field name for JSON Lines (default: 1)",
+    )
+    annotate.add_argument(
+        "--header", action="store_true", help="the first row of TSV or CSV input is a header"
+    )
+    annotate.add_argument(
+        "-o", "--output-name", help="the name of the new column or field (default: the scale)"
+    )
+    annotate.set_defaults(func=run_annotate)
+
+    tokenize_parser = subparsers.add_parser(
+        "tokenize",
+        parents=[common, parallel],
+        help="tokenize lines of text and look up each token",
+    )
+    tokenize_parser.set_defaults(func=run_tokenize)
+
+    dump = subparsers.add_parser(
+        "dump", parents=[common], help="write the words of a wordlist in frequency order"
+    )
+    dump.add_argument(
+        "-n", type=_nonnegative_int, help="the number of words to write (default: all)"
+    )
+    dump.set_defaults(func=run_dump)
+
+    build_index = subparsers.add_parser(
+        "build-index", help="build the index of all languages used by frequencies_across_languages"
+    )
+    build_index.add_argument(
+        "-w", "--wordlist", default="best", help="the wordlist to index: 'best' or 'small'"
+    )
+    build_index.set_defaults(func=run_build_index)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> None:
+    """
+    Run the `wordfreq` command, reading from stdin and writing to stdout.
+    """
+    args = make_parser().parse_args(argv)
+    if getattr(args, "jobs", 1) == 0:
+        args.jobs = os.cpu_count() or 1
+    cast(io.TextIOWrapper, sys.stdin).reconfigure(encoding="utf-8", newline="")
+    cast(io.TextIOWrapper, sys.stdout).reconfigure(encoding="utf-8")
+    try:
+        args.func(args, sys.stdin, sys.stdout)
+        sys.stdout.flush()
+    except BrokenPipeError:
+        # The output was closed early, such as by `head`. Point stdout at
+        # /dev/null so Python doesn't complain again when it exits.
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import bisect
+import gzip
+import heapq
+import sys
+from array import array
+from typing import Iterable, Iterator
+
+import msgpack
+
+# Every this many words, a key is kept in a list that `CombinedIndex.lookup`
+# can search with `bisect`, before searching among the words in between
+KEY_INTERVAL = 64
+
+
+def _little_endian(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_little_endian(typecode: str, data: bytes) -> array:
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+class CombinedIndex:
+    """
+    An index of the words in many languages' wordlists at once, which stores
+    each distinct word only once.
+
+    The words are UTF-8 encoded and concatenated in sorted order into one
+    bytes object, so a word can be found by binary search. Each word has a
+    list of postings, saying which languages it appears in and how frequent
+    it is there, as the index of its centibel band (see `read_cBpack`).
+
+    This takes much less memory than the dictionaries from
+    `get_frequency_dict` for all the same languages, because it doesn't need
+    a Python object for each word. Only every `KEY_INTERVAL`th word is kept
+    as a Python object, to narrow down where to look for a word.
+    """
+
+    def __init__(
+        self,
+        languages: list[str],
+        words: bytes,
+        word_offsets: array,
+        posting_offsets: array,
+        posting_langs: bytes,
+        posting_bands: array,
+        source: str = "",
+    ) -> None:
+        self.languages = languages
+        self.source = source
+        self._words = words
+        self._word_offsets = word_offsets
+        self._posting_offsets = posting_offsets
+        self._posting_langs = posting_langs
+        self._posting_bands = posting_bands
+        self._keys = [self._word_at(index) for index in range(0, len(self), KEY_INTERVAL)]
+
+    @classmethod
+    def build(
+        cls, packs: Iterable[tuple[str, list[list[str]]]], source: str = ""
+    ) -> CombinedIndex:
+        """
+        Build an index from pairs of a language code and the cBpack data for
+        that language, as returned by `read_cBpack`. `source` is a string that
+        identifies the data the index was built from, which is saved with it.
+        """
+        languages = []
+        streams = []
+        for lang_index, (lang, pack) in enumerate(packs):
+            languages.append(lang)
+            # Sorting puts a word that appears in more than one band next to
+            # itself, with the highest band last, which is the one that
+            # `get_frequency_dict` would keep
+            entries = sorted((word, band) for band, bucket in enumerate(pack) for word in bucket)
+            streams.append(_tag_entries(entries, lang_index))
+        if len(languages) > 255:
+            raise ValueError("A CombinedIndex can't contain more than 255 languages")
+
+        words = bytearray()
+        word_offsets = array("I", [0])
+        posting_offsets = array("I", [0])
+        posting_langs = bytearray()
+        posting_bands = array("H")
+        previous: tuple[str, int] | None = None
+        for word, lang_index, band in heapq.merge(*streams):
+            if previous is not None and previous == (word, lang_index):
+                posting_bands[-1] = band
+                continue
+            if previous is None or previous[0] != word:
+                if previous is not None:
+                    posting_offsets.append(len(posting_langs))
+                words.extend(word.encode("utf-8"))
+                word_offsets.append(len(words))
+            posting_langs.append(lang_index)
+            posting_bands.append(band)
+            previous = (word, lang_index)
+        if previous is not None:
+            posting_offsets.append(len(posting_langs))
+
+        return cls(
+            languages,
+            bytes(words),
+            word_offsets,
+            posting_offsets,
+            bytes(posting_langs),
+            posting_bands,
+            source,
+        )
+
+    @classmethod
+    def load(cls, filename: str) -> CombinedIndex:
+        """
+        Read an index that was written by `save`.
+        """
+        with gzip.open(filename, "rb") as infile:
+            data = msgpack.load(infile, raw=False)
+        header = data[0]
+        if (
+            not isinstance(header, dict)
+            or header.get("format") != "combined"
+            or header.get("version") != 1
+        ):
+            raise ValueError(f"Unexpected header: {header!r}")
+        words, word_offsets, posting_offsets, posting_langs, posting_bands = data[1:]
+        return cls(
+            header["languages"],
+            words,
+            _from_little_endian("I", word_offsets),
+            _from_little_endian("I", posting_offsets),
+            posting_langs,
+            _from_little_endian("H", posting_bands),
+            header.get("source", ""),
+        )
+
+    def save(self, filename: str) -> None:
+        """
+        Write the index to a gzipped msgpack file, similar to a cBpack file.
+        """
+        data = [
+            {
+                "format": "combined",
+                "version": 1,
+                "languages": self.languages,
+                "source": self.source,
+            },
+            self._words,
+            _little_endian(self._word_offsets),
+            _little_endian(self._posting_offsets),
+            self._posting_langs,
+            _little_endian(self._posting_bands),
+        ]
+        with gzip.open(filename, "wb") as outfile:
+            msgpack.dump(data, outfile, use_bin_type=True)
+
+    def __len__(self) -> int:
+        """
+        Get the number of distinct words in the index.
+        """
+        return len(self._word_offsets) - 1
+
+    def _word_at(self, index: int) -> bytes:
+        return self._words[self._word_offsets[index] : self._word_offsets[index + 1]]
+
+    def lookup(self, word: str) -> list[tuple[str, int]]:
+        """
+        Find the languages that `word` appears in. Returns a list of pairs
+        of a language code and the index of the word's centibel band in that
+        language, so its frequency there is `cB_to_freq(-band)`.
+        """
+        key = word.encode("utf-8")
+        block = bisect.bisect_right(self._keys, key) - 1
+        if block < 0:
+            return []
+        lo = block * KEY_INTERVAL
+        hi = min(lo + KEY_INTERVAL, len(self))
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._word_at(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == len(self) or self._word_at(lo) != key:
+            return []
+        start = self._posting_offsets[lo]
+        end = self._posting_offsets[lo + 1]
+        return [
+            (self.languages[self._posting_langs[pos]], self._posting_bands[pos])
+            for pos in range(start, end)
+        ]
+
+
+def _tag_entries(
+    entries: list[tuple[str, int]], lang_index: int
+) -> Iterator[tuple[str, int, int]]:
+    for word, band in entries:
+        yield word, lang_index, band
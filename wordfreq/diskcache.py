@@ -0,0 +1,279 @@
+from __future__ import annotations
+
+import hashlib
+import importlib.metadata
+import json
+import logging
+import os
+import sqlite3
+import threading
+import weakref
+from pathlib import Path
+
+from .util import data_path
+
+logger = logging.getLogger(__name__)
+
+# The default number of entries a DiskCache keeps before it starts evicting
+# the oldest ones
+DEFAULT_MAX_ENTRIES = 1000000
+
+# Writes are buffered and committed in batches of this size, so that a miss
+# doesn't cost a transaction
+WRITE_BATCH_SIZE = 256
+
+# The packages whose versions can change how text is tokenized
+TOKENIZER_PACKAGES = ["wordfreq", "jieba", "mecab-python3", "ipadic", "mecab-ko-dic"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tokens (
+    text TEXT NOT NULL,
+    lang TEXT NOT NULL,
+    version TEXT NOT NULL,
+    tokens TEXT NOT NULL,
+    PRIMARY KEY (text, lang, version)
+)
+"""
+
+
+def data_version() -> str:
+    """
+    Get a short string that identifies the code and data that tokenization
+    depends on: the versions of wordfreq and the CJK tokenizers, and the
+    names and sizes of the data files. Cached tokens are only used if they
+    were stored under the same version.
+    """
+    digest = hashlib.sha1()
+    for package in TOKENIZER_PACKAGES:
+        try:
+            version = importlib.metadata.version(package)
+        except importlib.metadata.PackageNotFoundError:
+            version = "-"
+        digest.update(f"{package}={version}\n".encode())
+    for path in sorted(data_path().iterdir()):
+        if path.is_file():
+            digest.update(f"{path.name}:{path.stat().st_size}\n".encode())
+    return digest.hexdigest()[:16]
+
+
+class DiskCache:
+    """
+    A cache of tokenization results in an SQLite file, which lets the results
+    of slow tokenizers such as MeCab and Jieba outlast the process that
+    computed them. Many processes can share the same file.
+
+    The cache maps a piece of text and the language it was looked up in to
+    the tokens that `lossy_tokenize` produced. It doesn't store frequencies,
+    because once the tokens are known, looking them up in a wordlist takes
+    very little time.
+
+    When the cache holds more than `max_entries` entries, the oldest ones are
+    deleted.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        version: str | None = None,
+    ) -> None:
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.version = version if version is not None else data_version()
+        self._lock = threading.Lock()
+        self._pending: dict[tuple[str, str], str] = {}
+        self._conn: sqlite3.Connection | None = None
+        self._pid = -1
+        self._count = 0
+        _open_caches.add(self)
+
+    def _after_fork(self) -> None:
+        # Another thread may have been holding the lock when the process
+        # forked, and it will never release it in the child, so start over
+        # with a new lock. The parent's connection is kept but never used or
+        # closed here, because closing it could make SQLite clean up files
+        # that the parent is still using.
+        self._lock = threading.Lock()
+        if self._conn is not None:
+            _inherited_connections.append(self._conn)
+        self._conn = None
+        self._pending.clear()
+
+    def _connection(self) -> sqlite3.Connection:
+        # A connection can't be used on both sides of a fork, so a child
+        # process opens its own, and leaves the parent's pending writes to
+        # the parent.
+        if self._conn is None or self._pid != os.getpid():
+            if self._conn is not None:
+                self._pending.clear()
+            conn = sqlite3.connect(self.path, timeout=30.0, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(SCHEMA)
+            conn.commit()
+            self._conn = conn
+            self._pid = os.getpid()
+            self._count = conn.execute("SELECT COUNT(*) FROM tokens").fetchone()[0]
+        return self._conn
+
+    def get(self, text: str, lang: str) -> tuple[str, ...] | None:
+        """
+        Get the cached tokens for `text` in `lang`, or None if they aren't
+        cached.
+        """
+        with self._lock:
+            try:
+                conn = self._connection()
+                encoded = self._pending.get((text, lang))
+                if encoded is None:
+                    row = conn.execute(
+                        "SELECT tokens FROM tokens WHERE text = ? AND lang = ? AND version = ?",
+                        (text, lang, self.version),
+                    ).fetchone()
+                    if row is None:
+                        return None
+                    encoded = row[0]
+            except sqlite3.Error as err:
+                logger.warning(f"Couldn't read from the token cache at {self.path}: {err}")
+                return None
+        return tuple(json.loads(encoded))
+
+    def put(self, text: str, lang: str, tokens: tuple[str, ...]) -> None:
+        """
+        Store the tokens for `text` in `lang`. They are written to disk in
+        batches, or when `flush` is called.
+        """
+        with self._lock:
+            self._pending[text, lang] = json.dumps(tokens, ensure_ascii=False)
+            if len(self._pending) >= WRITE_BATCH_SIZE:
+                self._flush()
+
+    def flush(self) -> None:
+        """
+        Write any tokens that haven't been written yet.
+        """
+        with self._lock:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._pending:
+            return
+        try:
+            conn = self._connection()
+            rows = [
+                (text, lang, self.version, encoded)
+                for (text, lang), encoded in self._pending.items()
+            ]
+            self._pending.clear()
+            with conn:
+                inserted = conn.executemany(
+                    "INSERT OR IGNORE INTO tokens (text, lang, version, tokens) "
+                    "VALUES (?, ?, ?, ?)",
+                    rows,
+                ).rowcount
+                if inserted < len(rows):
+                    # Some entries were already there, so update them instead
+                    conn.executemany(
+                        "UPDATE tokens SET tokens = ? "
+                        "WHERE text = ? AND lang = ? AND version = ? AND tokens != ?",
+                        [(encoded, *key, encoded) for *key, encoded in rows],
+                    )
+            # Only new rows count toward the number of entries
+            self._count += inserted
+            if self._count > self.max_entries:
+                self._evict(conn)
+        except sqlite3.Error as err:
+            logger.warning(f"Couldn't write to the token cache at {self.path}: {err}")
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        # Our count is only an estimate, because other processes write to the
+        # same file, so check it first
+        self._count = conn.execute("SELECT COUNT(*) FROM tokens").fetchone()[0]
+        excess = self._count - self.max_entries
+        if excess > 0:
+            # Evict a tenth of the cache at a time, so this doesn't happen on
+            # every write once the cache is full
+            excess += self.max_entries // 10
+            with conn:
+                conn.execute(
+                    "DELETE FROM tokens WHERE rowid IN "
+                    "(SELECT rowid FROM tokens ORDER BY rowid LIMIT ?)",
+                    (excess,),
+                )
+            self._count = max(self._count - excess, 0)
+
+    def warm(self, snapshot: str | os.PathLike) -> int:
+        """
+        Copy the entries for the current data version from a snapshot, which
+        is a file made by `snapshot` or another cache file. Entries that are
+        already in the cache are kept. Returns the number of entries copied.
+        """
+        with self._lock:
+            self._flush()
+            conn = self._connection()
+            conn.execute("ATTACH DATABASE ? AS snapshot", (str(snapshot),))
+            try:
+                with conn:
+                    copied = conn.execute(
+                        "INSERT OR IGNORE INTO tokens (text, lang, version, tokens) "
+                        "SELECT text, lang, version, tokens FROM snapshot.tokens "
+                        "WHERE version = ?",
+                        (self.version,),
+                    ).rowcount
+            finally:
+                conn.execute("DETACH DATABASE snapshot")
+            self._count += copied
+            if self._count > self.max_entries:
+                self._evict(conn)
+            return copied
+
+    def snapshot(self, path: str | os.PathLike) -> None:
+        """
+        Write a copy of the cache to `path`, which can be used later to warm
+        up a new cache with `warm`.
+        """
+        with self._lock:
+            self._flush()
+            target = sqlite3.connect(path)
+            try:
+                self._connection().backup(target)
+            finally:
+                target.close()
+
+    def close(self) -> None:
+        """
+        Write any pending tokens and close the file.
+        """
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._flush()
+                self._conn.close()
+            self._conn = None
+
+    def __len__(self) -> int:
+        """
+        Count the entries stored for the current data version.
+        """
+        with self._lock:
+            self._flush()
+            return (
+                self._connection()
+                .execute("SELECT COUNT(*) FROM tokens WHERE version = ?", (self.version,))
+                .fetchone()[0]
+            )
+
+
+# The caches in this process, which need a new lock after a fork
+_open_caches: weakref.WeakSet[DiskCache] = weakref.WeakSet()
+
+# Connections that a forked process inherited from its parent
+_inherited_connections: list[sqlite3.Connection] = []
+
+
+def _reset_after_fork() -> None:
+    for cache in list(_open_caches):
+        cache._after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
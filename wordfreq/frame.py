@@ -0,0 +1,143 @@
+"""
+Look up the frequencies of whole columns of words at once, from pandas or
+PyArrow. This module requires NumPy, and pandas or PyArrow for the type of
+column you give it, none of which are installed with wordfreq.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable
+
+import numpy as np
+
+from wordfreq import word_frequency, zipf_frequency
+
+# Distinct words are looked up in chunks of this size when they're spread
+# across multiple processes
+CHUNK_SIZE = 10000
+
+
+def _factorize(values: Iterable) -> tuple[np.ndarray, list]:
+    """
+    Convert a column into an integer code for each row, and a list of the
+    distinct values that the codes refer to. Missing values get the code -1.
+    """
+    if hasattr(values, "dictionary_encode"):
+        # A PyArrow Array or ChunkedArray
+        import pyarrow.compute as pc
+
+        if hasattr(values, "combine_chunks"):
+            values = values.combine_chunks()
+        encoded = values.dictionary_encode()
+        codes = pc.fill_null(encoded.indices, -1).to_numpy(zero_copy_only=False)
+        return codes.astype(np.int64), encoded.dictionary.to_pylist()
+    else:
+        import pandas as pd
+
+        if not hasattr(values, "dtype"):
+            values = np.array(list(values), dtype=object)
+        codes, uniques = pd.factorize(values)
+        return codes.astype(np.int64), list(uniques)
+
+
+def _lookup_chunk(
+    func: Callable[..., float], words: list[str], lang: str, wordlist: str, minimum: float
+) -> list[float]:
+    return [func(word, lang, wordlist, minimum) for word in words]
+
+
+def _annotate(
+    func: Callable[..., float],
+    values: Iterable,
+    lang: str | Iterable,
+    wordlist: str,
+    minimum: float,
+    jobs: int,
+) -> np.ndarray:
+    """
+    Apply `func`, which is `word_frequency` or `zipf_frequency`, to a column
+    of words in a language or a column of languages. Each distinct pair of a
+    word and a language is looked up only once.
+    """
+    word_codes, words = _factorize(values)
+    if isinstance(lang, str):
+        lang_codes = np.zeros(len(word_codes), dtype=np.int64)
+        langs = [lang]
+    else:
+        lang_codes, langs = _factorize(lang)
+        if len(lang_codes) != len(word_codes):
+            raise ValueError("The column of languages must be as long as the column of words")
+
+    output = np.full(len(word_codes), np.nan, dtype=np.float32)
+    present = (word_codes >= 0) & (lang_codes >= 0)
+    if not present.any():
+        return output
+
+    pair_keys = lang_codes[present] * len(words) + word_codes[present]
+    unique_keys, inverse = np.unique(pair_keys, return_inverse=True)
+    unique_results = np.empty(len(unique_keys), dtype=np.float32)
+
+    # Group the distinct words by language, so each batch of lookups uses
+    # one wordlist
+    tasks = []
+    boundaries = np.searchsorted(unique_keys // len(words), np.arange(len(langs) + 1))
+    for lang_index, language in enumerate(langs):
+        start, end = boundaries[lang_index], boundaries[lang_index + 1]
+        group = [words[key] for key in (unique_keys[start:end] % len(words)).tolist()]
+        for chunk_start in range(0, len(group), CHUNK_SIZE):
+            chunk = group[chunk_start : chunk_start + CHUNK_SIZE]
+            tasks.append((start + chunk_start, chunk, language))
+
+    if jobs > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(jobs) as executor:
+            futures = [
+                (offset, executor.submit(_lookup_chunk, func, chunk, language, wordlist, minimum))
+                for offset, chunk, language in tasks
+            ]
+            for offset, future in futures:
+                results = future.result()
+                unique_results[offset : offset + len(results)] = results
+    else:
+        for offset, chunk, language in tasks:
+            results = _lookup_chunk(func, chunk, language, wordlist, minimum)
+            unique_results[offset : offset + len(results)] = results
+
+    output[present] = unique_results[inverse]
+    return output
+
+
+def zipf_column(
+    values: Iterable,
+    lang: str | Iterable,
+    wordlist: str = "best",
+    minimum: float = 0.0,
+    jobs: int = 1,
+) -> np.ndarray:
+    """
+    Get the `zipf_frequency` of each word in a column, as a float32 NumPy
+    array in the same order. `values` can be a pandas Series, a PyArrow
+    array, or a list of strings.
+
+    `lang` is either a language code for every word, or a column of
+    language codes the same length as `values`. Rows where the word or the
+    language is missing get NaN.
+
+    Each distinct word is only looked up once per language. With `jobs`
+    greater than 1, the lookups are divided among that many processes.
+    """
+    return _annotate(zipf_frequency, values, lang, wordlist, minimum, jobs)
+
+
+def frequency_column(
+    values: Iterable,
+    lang: str | Iterable,
+    wordlist: str = "best",
+    minimum: float = 0.0,
+    jobs: int = 1,
+) -> np.ndarray:
+    """
+    Get the `word_frequency` of each word in a column, as a float32 NumPy
+    array in the same order. See `zipf_column` for the arguments.
+    """
+    return _annotate(word_frequency, values, lang, wordlist, minimum, jobs)
@@ -39,7 +39,9 @@ def mecab_tokenize(text: str, lang: str) -> list[str]:
         MECAB_ANALYZERS[lang] = make_mecab_analyzer(lang)
 
     analyzer = MECAB_ANALYZERS[lang]
-    text = unicodedata.normalize("NFKC", text.strip())
+    text = text.strip()
+    if not unicodedata.is_normalized("NFKC", text):
+        text = unicodedata.normalize("NFKC", text)
     analyzed = analyzer.parse(text)
     if not analyzed:
         return []
@@ -1,4 +1,8 @@
+from __future__ import annotations
+
 import unicodedata
+from functools import lru_cache, partial
+from typing import Callable, Literal
 
 import regex
 from langcodes import Language
@@ -168,31 +172,57 @@ def preprocess_text(text: str, language: Language) -> str:
     There are some steps where we unify them internally: see chinese.py
     for more information.
     """
-    # NFC or NFKC normalization, as needed for the language
+    for step in get_preprocessing_steps(language):
+        text = step(text)
+    return text
+
+
+@lru_cache(maxsize=None)
+def get_preprocessing_steps(language: str | Language) -> tuple[Callable[[str], str], ...]:
+    """
+    Get the steps that `preprocess_text` applies to text in the given
+    language, as a tuple of functions to apply in order.
+
+    Working out which steps apply takes longer than running most of them, so
+    we do it once per language. Each step runs once over the whole text.
+    """
     info = get_language_info(language)
-    text = unicodedata.normalize(info["normal_form"], text)
+    steps: list[Callable[[str], str]] = []
+
+    # NFC or NFKC normalization, as needed for the language
+    steps.append(partial(normalize, info["normal_form"]))
 
     # Transliteration of multi-script languages
     if info["transliteration"] is not None:
-        text = transliterate(info["transliteration"], text)
+        steps.append(partial(transliterate, info["transliteration"]))
 
     # Abjad mark removal
     if info["remove_marks"]:
-        text = remove_marks(text)
+        steps.append(remove_marks)
 
     # Case folding
     if info["dotless_i"]:
-        text = casefold_with_i_dots(text)
+        steps.append(casefold_with_i_dots)
     else:
-        text = text.casefold()
+        steps.append(str.casefold)
 
     # Fixing of diacritics
     if info["diacritics_under"] == "commas":
-        text = cedillas_to_commas(text)
+        steps.append(cedillas_to_commas)
     elif info["diacritics_under"] == "cedillas":
-        text = commas_to_cedillas(text)
+        steps.append(commas_to_cedillas)
 
-    return text
+    return tuple(steps)
+
+
+def normalize(form: Literal["NFC", "NFD", "NFKC", "NFKD"], text: str) -> str:
+    """
+    Apply a Unicode normal form to the text, skipping the work when the text
+    is already in that form, which it usually is.
+    """
+    if unicodedata.is_normalized(form, text):
+        return text
+    return unicodedata.normalize(form, text)
 
 
 def remove_marks(text: str) -> str:
@@ -213,7 +243,7 @@ def casefold_with_i_dots(text: str) -> str:
     that's appropriate for Turkish and related languages, then case-fold
     the rest of the letters.
     """
-    text = unicodedata.normalize("NFC", text).replace("İ", "i").replace("I", "ı")
+    text = normalize("NFC", text).replace("İ", "i").replace("I", "ı")
     return text.casefold()
 
 
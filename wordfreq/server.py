@@ -0,0 +1,439 @@
+"""
+A small HTTP server for looking up word frequencies from programs that aren't
+written in Python. It only uses the standard library. Run it with:
+
+    python -m wordfreq.server --port 8080 --lang en fr de
+
+It answers these requests, with JSON responses:
+
+- `GET /frequency?word=...&lang=...`: look up one word
+- `POST /frequency` with `{"lang": ..., "words": [...]}`: look up many words
+- `GET /tokenize?text=...&lang=...`, or `POST /tokenize` with
+  `{"lang": ..., "text": ...}`: tokenize text and look up each token
+- `GET /top?lang=...&n=...`: the `n` most frequent words, for `n` up to 10000
+- `GET /healthz`: whether the server is running
+- `GET /readyz`: whether the languages have been loaded
+- `GET /stats`: request counts, latencies, and cache sizes
+
+Lookups accept `wordlist` (default 'best') and `scale`, which is 'zipf' (the
+default), 'freq', or 'cB'.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Hashable, Iterable, TypeVar
+from urllib.parse import parse_qsl, urlsplit
+
+import wordfreq
+from wordfreq import cB_to_zipf, tokenize, top_n_list, word_cB, word_cBs, word_frequency
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Limits on what a client can send
+MAX_HEADER_SIZE = 16384
+MAX_BODY_SIZE = 10 * 1024 * 1024
+
+# How long an idle keep-alive connection stays open, in seconds
+KEEP_ALIVE_TIMEOUT = 60.0
+
+# Requests that would take longer than this many words or characters are
+# handled in a worker thread, so they don't hold up other requests
+INLINE_LIMIT = 100
+
+# The most words that `/top` returns
+MAX_TOP_N = 10000
+
+# The number of recent latencies per endpoint that percentiles are computed
+# from
+LATENCY_WINDOW = 1000
+
+SCALES = {"zipf", "freq", "cB"}
+
+# The paths that statistics are kept for separately. Requests for any other
+# path are counted together.
+ENDPOINTS = {"/frequency", "/tokenize", "/top", "/healthz", "/readyz", "/stats"}
+
+REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    411: "Length Required",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+
+class HTTPError(Exception):
+    """
+    An error that should be sent to the client with the given status code.
+    """
+
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+def lookup_words(words: Iterable[str], lang: str, wordlist: str, scale: str) -> list:
+    """
+    Look up a list of words on the given scale.
+    """
+    if scale == "freq":
+        return [word_frequency(word, lang, wordlist) for word in words]
+    cBs = word_cBs(words, lang, wordlist)
+    if scale == "zipf":
+        return [cB_to_zipf(cB) for cB in cBs]
+    return cBs
+
+
+def lookup_tokens(text: str, lang: str, wordlist: str, scale: str) -> dict:
+    """
+    Tokenize text, and look up each token on the given scale.
+    """
+    tokens = tokenize(text, lang)
+    return {"tokens": tokens, "values": lookup_words(tokens, lang, wordlist, scale)}
+
+
+class WordfreqServer:
+    """
+    The state of the server: which languages it has loaded, the lookups in
+    progress, and statistics about the requests it has answered.
+
+    Lookups that only take a moment are answered directly in the event loop.
+    Bigger ones run in a thread, and identical requests that arrive while one
+    is running wait for its result instead of doing the same work again. So
+    do lookups in a language whose wordlist hasn't been loaded yet, because
+    loading it takes a while.
+    """
+
+    def __init__(self, languages: list[str], wordlist: str = "best") -> None:
+        self.languages = languages
+        self.wordlist = wordlist
+        self.ready = False
+        self.started = time.time()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="wordfreq")
+        self.in_flight: dict[tuple, asyncio.Future] = {}
+        self.counts: dict[str, int] = defaultdict(int)
+        self.latencies: dict[str, deque] = defaultdict(lambda: deque(maxlen=LATENCY_WINDOW))
+        self.coalesced = 0
+        self.connections = 0
+        # What has been loaded so far, as keys of the form `(kind, lang,
+        # wordlist)`, where kind is "lookup" or "top"
+        self.loaded: set[tuple[str, str, str]] = set()
+
+    def preload(self) -> None:
+        """
+        Load the wordlists and tokenizers for the configured languages.
+        """
+        for lang in self.languages:
+            start = time.perf_counter()
+            try:
+                word_cB("preload", lang, self.wordlist)
+                wordfreq._surface_form_table(lang, self.wordlist)
+            except LookupError as err:
+                logger.error(f"Couldn't load {lang!r}: {err}")
+                continue
+            self.loaded.add(("lookup", lang, self.wordlist))
+            logger.info(f"Loaded {lang!r} in {time.perf_counter() - start:.2f}s")
+        self.ready = True
+
+    async def start(self, host: str, port: int) -> asyncio.Server:
+        """
+        Start listening, and load the languages in the background. Until
+        they're loaded, `/readyz` reports that the server isn't ready.
+        """
+        server = await asyncio.start_server(
+            self.handle_connection, host, port, limit=MAX_HEADER_SIZE
+        )
+        loop = asyncio.get_running_loop()
+        loop.run_in_executor(self.executor, self.preload)
+        return server
+
+    async def run(self, func: Callable[..., T], *args: Hashable) -> T:
+        """
+        Run a lookup in the worker thread, sharing the result with any
+        identical lookup that is already running.
+        """
+        key = (func.__name__, *args)
+        future = self.in_flight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future)
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self.executor, func, *args)
+        self.in_flight[key] = future
+        try:
+            return await asyncio.shield(future)
+        finally:
+            if self.in_flight.get(key) is future:
+                del self.in_flight[key]
+
+    async def call(
+        self,
+        loaded_key: tuple[str, str, str],
+        inline: bool,
+        func: Callable[..., T],
+        *args: Hashable,
+    ) -> T:
+        """
+        Run a lookup directly if `inline` is True and what it needs, described
+        by `loaded_key`, is already loaded. Otherwise, run it in the worker
+        thread with `run`.
+        """
+        if inline and loaded_key in self.loaded:
+            return func(*args)
+        result = await self.run(func, *args)
+        self.loaded.add(loaded_key)
+        return result
+
+    async def handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """
+        Answer requests on one connection until the client closes it, asks
+        for it to be closed, or leaves it idle.
+        """
+        self.connections += 1
+        try:
+            keep_alive = True
+            while keep_alive:
+                try:
+                    head = await asyncio.wait_for(
+                        reader.readuntil(b"\r\n\r\n"), timeout=KEEP_ALIVE_TIMEOUT
+                    )
+                    keep_alive = await self.handle_request(head, reader, writer)
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    await self.respond(writer, 413, {"error": "Headers too large"}, False)
+                    break
+        finally:
+            self.connections -= 1
+            writer.close()
+
+    async def handle_request(
+        self, head: bytes, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> bool:
+        """
+        Answer one request. Returns whether the connection should stay open.
+        """
+        start = time.perf_counter()
+        request_line, *header_lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, version = request_line.split(" ")
+        except ValueError:
+            await self.respond(writer, 400, {"error": "Malformed request line"}, False)
+            return False
+        headers = {}
+        for line in header_lines:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+
+        connection = headers.get("connection", "").lower()
+        if version == "HTTP/1.0":
+            keep_alive = connection == "keep-alive"
+        else:
+            keep_alive = connection != "close"
+
+        if "transfer-encoding" in headers:
+            # Without a Content-Length, we wouldn't know where the body ends
+            await self.respond(
+                writer, 411, {"error": "Send the body with a Content-Length"}, False
+            )
+            return False
+
+        body = b""
+        length_header = headers.get("content-length", "0")
+        if not length_header.isdigit():
+            await self.respond(writer, 400, {"error": "Invalid Content-Length"}, False)
+            return False
+        length = int(length_header)
+        if length > MAX_BODY_SIZE:
+            await self.respond(writer, 413, {"error": "Request body too large"}, False)
+            return False
+        if length:
+            body = await reader.readexactly(length)
+
+        url = urlsplit(target)
+        path = url.path.rstrip("/") or "/"
+        try:
+            status, result = await self.dispatch(method, path, dict(parse_qsl(url.query)), body)
+        except HTTPError as err:
+            status, result = err.status, {"error": str(err)}
+        except LookupError as err:
+            status, result = 400, {"error": str(err)}
+        except Exception:
+            logger.exception(f"Error handling {method} {target}")
+            status, result = 500, {"error": "Internal error"}
+
+        await self.respond(writer, status, result, keep_alive)
+        endpoint = path if path in ENDPOINTS else "other"
+        self.counts[endpoint] += 1
+        self.latencies[endpoint].append(time.perf_counter() - start)
+        return keep_alive
+
+    async def dispatch(
+        self, method: str, path: str, params: dict[str, str], body: bytes
+    ) -> tuple[int, Any]:
+        """
+        Route a request to the code that answers it, returning the status
+        and the value to send as JSON.
+        """
+        if path == "/healthz":
+            return 200, {"status": "ok"}
+        if path == "/readyz":
+            return (200 if self.ready else 503), {"ready": self.ready}
+        if path == "/stats":
+            return 200, self.stats()
+
+        if method == "POST":
+            try:
+                params = {**params, **json.loads(body or b"{}")}
+            except (ValueError, TypeError):
+                raise HTTPError(400, "The request body isn't a JSON object") from None
+        elif method != "GET":
+            raise HTTPError(405, f"Unsupported method {method}")
+
+        lang = _param(params, "lang")
+        wordlist = _param(params, "wordlist", self.wordlist)
+        scale = _param(params, "scale", "zipf")
+        if scale not in SCALES:
+            raise HTTPError(400, f"Unknown scale {scale!r}")
+
+        loaded_key = ("lookup", lang, wordlist)
+        if path == "/frequency":
+            if "words" in params:
+                words = params["words"]
+                if not isinstance(words, list) or not all(isinstance(w, str) for w in words):
+                    raise HTTPError(400, "'words' must be a list of strings")
+                values = await self.call(
+                    loaded_key,
+                    len(words) <= INLINE_LIMIT,
+                    lookup_words,
+                    tuple(words),
+                    lang,
+                    wordlist,
+                    scale,
+                )
+                return 200, {"lang": lang, "scale": scale, "values": values}
+            word = _param(params, "word")
+            values = await self.call(
+                loaded_key, True, lookup_words, (word,), lang, wordlist, scale
+            )
+            return 200, {"word": word, "lang": lang, "scale": scale, "value": values[0]}
+        if path == "/tokenize":
+            text = _param(params, "text")
+            result = await self.call(
+                loaded_key, len(text) <= INLINE_LIMIT, lookup_tokens, text, lang, wordlist, scale
+            )
+            return 200, {"lang": lang, "scale": scale, **result}
+        if path == "/top":
+            try:
+                n = int(params.get("n", 100))
+            except (TypeError, ValueError):
+                raise HTTPError(400, "'n' must be an integer") from None
+            if not 1 <= n <= MAX_TOP_N:
+                raise HTTPError(400, f"'n' must be between 1 and {MAX_TOP_N}")
+            top = await self.call(("top", lang, wordlist), True, top_n_list, lang, n, wordlist)
+            return 200, {"lang": lang, "words": top}
+        raise HTTPError(404, f"Unknown path {path}")
+
+    def stats(self) -> dict:
+        """
+        Describe the requests the server has answered and the state of its
+        caches.
+        """
+        endpoints = {}
+        for path, count in sorted(self.counts.items()):
+            latencies = sorted(self.latencies[path])
+            endpoints[path] = {
+                "requests": count,
+                **{
+                    f"p{pct}_ms": round(latencies[(len(latencies) - 1) * pct // 100] * 1000, 3)
+                    for pct in (50, 90, 99)
+                },
+            }
+        return {
+            "ready": self.ready,
+            "uptime_s": round(time.time() - self.started, 1),
+            "languages": self.languages,
+            "connections": self.connections,
+            "coalesced_requests": self.coalesced,
+            "token_cache_size": len(wordfreq._token_cache),
+            "frequency_cache_size": len(wordfreq._freq_cache),
+            "endpoints": endpoints,
+        }
+
+    async def respond(
+        self, writer: asyncio.StreamWriter, status: int, result: object, keep_alive: bool
+    ) -> None:
+        """
+        Send a JSON response.
+        """
+        body = json.dumps(result, ensure_ascii=False).encode("utf-8")
+        head = (
+            f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+            "\r\n"
+        ).encode("latin-1")
+        writer.write(head + body)
+        await writer.drain()
+
+
+def _param(params: dict[str, Any], name: str, default: str | None = None) -> str:
+    if name not in params and default is not None:
+        return default
+    value = params.get(name)
+    if value is None:
+        raise HTTPError(400, f"Missing parameter {name!r}")
+    if not isinstance(value, str):
+        raise HTTPError(400, f"{name!r} must be a string")
+    return value
+
+
+async def serve(host: str, port: int, languages: list[str], wordlist: str) -> None:
+    """
+    Run the server until the process is stopped.
+    """
+    app = WordfreqServer(languages, wordlist)
+    server = await app.start(host, port)
+    logger.info(f"Serving word frequencies on {host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+def main() -> None:
+    """
+    Run the server with the options given on the command line.
+    """
+    parser = argparse.ArgumentParser(description="Serve word frequencies over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1", help="the address to listen on")
+    parser.add_argument("--port", type=int, default=8080, help="the port to listen on")
+    parser.add_argument(
+        "--lang", nargs="*", default=["en"], help="the languages to load when starting"
+    )
+    parser.add_argument("--wordlist", default="best", help="the default wordlist")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(serve(args.host, args.port, args.lang, args.wordlist))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import os
+import queue
+import sqlite3
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterable
+
+import langcodes
+
+# The most values we put in one `IN (...)` clause. SQLite allows at least 999
+# parameters in a query, including the language and wordlist.
+QUERY_BATCH_SIZE = 900
+
+SCHEMA = """
+CREATE TABLE words (
+    lang TEXT NOT NULL,
+    wordlist TEXT NOT NULL,
+    word TEXT NOT NULL,
+    cB INTEGER NOT NULL,
+    rank INTEGER NOT NULL,
+    PRIMARY KEY (lang, wordlist, word)
+) WITHOUT ROWID;
+CREATE INDEX words_by_rank ON words (lang, wordlist, rank);
+CREATE TABLE wordlists (
+    lang TEXT NOT NULL,
+    wordlist TEXT NOT NULL,
+    source TEXT NOT NULL,
+    PRIMARY KEY (lang, wordlist)
+);
+"""
+
+
+def export_sqlite(
+    path: str | os.PathLike,
+    wordlists: Iterable[str] = ("small", "large"),
+    languages: Iterable[str] | None = None,
+) -> None:
+    """
+    Write the wordlists to a new SQLite file at `path`, which can be queried
+    with SQL or used by `SQLiteBackend`.
+
+    The `words` table has a row for each word of each wordlist, with its
+    language, the name of the wordlist, the word, its frequency in
+    centibels, and its rank, which is its position in `iter_wordlist`
+    starting from 0. The `wordlists` table says which wordlist is used for
+    each language and wordlist name, including 'best'.
+
+    By default, this exports every language. `languages` can limit it to
+    some of them.
+    """
+    from wordfreq import available_languages, get_frequency_list
+
+    path = Path(path)
+    if path.exists():
+        raise FileExistsError(f"{path} already exists")
+    wanted = None if languages is None else set(languages)
+    best: dict[str, str] = {}
+    conn = sqlite3.connect(path)
+    try:
+        conn.executescript(SCHEMA)
+        for wordlist in wordlists:
+            for lang in sorted(available_languages(wordlist)):
+                if wanted is not None and lang not in wanted:
+                    continue
+                pack = get_frequency_list(lang, wordlist)
+                ranked = ((-index, word) for index, bucket in enumerate(pack) for word in bucket)
+                rows = ((lang, wordlist, word, cB, rank) for rank, (cB, word) in enumerate(ranked))
+                with conn:
+                    conn.executemany("INSERT INTO words VALUES (?, ?, ?, ?, ?)", rows)
+                    conn.execute(
+                        "INSERT INTO wordlists VALUES (?, ?, ?)", (lang, wordlist, wordlist)
+                    )
+                # 'best' means 'large' when it's available, like in
+                # `available_languages`
+                if wordlist == "large" or (wordlist == "small" and lang not in best):
+                    best[lang] = wordlist
+
+        with conn:
+            conn.executemany("INSERT INTO wordlists VALUES (?, 'best', ?)", sorted(best.items()))
+        conn.execute("ANALYZE")
+    finally:
+        conn.close()
+
+
+class SQLiteBackend:
+    """
+    Looks up word frequencies in a file made by `export_sqlite`, instead of
+    loading wordlists into memory. Use `enable_sqlite_backend` to make
+    `word_frequency` and the related functions use it.
+
+    Queries go through a pool of read-only connections, so many threads can
+    use the backend at once. Each call to `lookup` queries a batch of words
+    at a time.
+    """
+
+    def __init__(self, path: str | os.PathLike, pool_size: int = 4) -> None:
+        self.path = Path(path)
+        if not self.path.exists():
+            raise FileNotFoundError(f"There's no wordfreq database at {self.path}")
+        self.pool_size = pool_size
+        self._lock = threading.Lock()
+        self._pool: queue.Queue[sqlite3.Connection] = queue.Queue()
+        self._opened = 0
+        self._pid = os.getpid()
+        with self._connection() as conn:
+            rows = conn.execute("SELECT lang, wordlist, source FROM wordlists").fetchall()
+            self.max_band = -(conn.execute("SELECT MIN(cB) FROM words").fetchone()[0] or 0)
+        self._sources = {(lang, wordlist): source for lang, wordlist, source in rows}
+        self._languages: dict[str, list[str]] = {}
+        for lang, wordlist in self._sources:
+            self._languages.setdefault(wordlist, []).append(lang)
+        self._resolved: dict[tuple[str, str], tuple[str, str]] = {}
+        self._word_limits: dict[tuple[str, str, int], int | None] = {}
+
+    def _open(self) -> sqlite3.Connection:
+        uri = self.path.resolve().as_uri() + "?mode=ro"
+        return sqlite3.connect(uri, uri=True, check_same_thread=False)
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            if self._pid != os.getpid():
+                # Connections can't be shared with a forked process, so start
+                # a new pool
+                self._pool = queue.Queue()
+                self._opened = 0
+                self._pid = os.getpid()
+            pool = self._pool
+            if pool.empty() and self._opened < self.pool_size:
+                self._opened += 1
+                pool.put(self._open())
+        conn = pool.get()
+        try:
+            yield conn
+        finally:
+            pool.put(conn)
+
+    def resolve(self, lang: str, wordlist: str) -> tuple[str, str]:
+        """
+        Find the language and wordlist in the database that a lookup for
+        `lang` and `wordlist` should use, the way `get_frequency_list` finds
+        the best matching language.
+        """
+        key = (lang, wordlist)
+        if key not in self._resolved:
+            available = self._languages.get(wordlist, [])
+            best, _distance = langcodes.closest_match(lang, available, max_distance=60)
+            if best == "und":
+                raise LookupError(f"No wordlist {wordlist!r} available for language {lang!r}")
+            self._resolved[key] = (best, self._sources[best, wordlist])
+        return self._resolved[key]
+
+    def lookup(
+        self,
+        words: Iterable[str],
+        lang: str,
+        wordlist: str = "best",
+        min_zipf: float | None = None,
+        max_words: int | None = None,
+    ) -> dict[str, int]:
+        """
+        Look up the frequencies of words in centibels. Returns a dictionary
+        that contains the words that were found.
+
+        `min_zipf` and `max_words` leave out the less frequent words, the same
+        way they do in `get_frequency_list`, so words below the cutoff aren't
+        found.
+        """
+        from wordfreq import _zipf_to_band
+
+        lang, source = self.resolve(lang, wordlist)
+        min_cB = None
+        if min_zipf is not None:
+            min_cB = -_zipf_to_band(min_zipf)
+        if max_words is not None:
+            limit = self._word_limit(lang, source, max_words)
+            if limit is not None:
+                min_cB = limit if min_cB is None else max(min_cB, limit)
+        cutoff = "" if min_cB is None else "AND cB >= ? "
+        cutoff_params = () if min_cB is None else (min_cB,)
+
+        results: dict[str, int] = {}
+        unique = list(dict.fromkeys(words))
+        with self._connection() as conn:
+            for start in range(0, len(unique), QUERY_BATCH_SIZE):
+                batch = unique[start : start + QUERY_BATCH_SIZE]
+                placeholders = ", ".join("?" * len(batch))
+                results.update(
+                    conn.execute(
+                        f"SELECT word, cB FROM words WHERE lang = ? AND wordlist = ? {cutoff}"
+                        f"AND word IN ({placeholders})",
+                        (lang, source, *cutoff_params, *batch),
+                    )
+                )
+        return results
+
+    def _word_limit(self, lang: str, source: str, max_words: int) -> int | None:
+        """
+        Get the lowest frequency in centibels that keeps at most `max_words`
+        words, stopping at the end of a band the way `read_cBpack` does, or
+        None if the whole wordlist fits.
+        """
+        key = (lang, source, max_words)
+        if key not in self._word_limits:
+            with self._connection() as conn:
+                # The word just past the limit is in the first band that
+                # doesn't fit
+                row = conn.execute(
+                    "SELECT cB FROM words WHERE lang = ? AND wordlist = ? AND rank = ?",
+                    (lang, source, max(max_words, 0)),
+                ).fetchone()
+            self._word_limits[key] = None if row is None else row[0] + 1
+        return self._word_limits[key]
+
+    def top_n(self, lang: str, n: int, wordlist: str = "best") -> list[str]:
+        """
+        Get the `n` most frequent words, in the order of `iter_wordlist`.
+        """
+        lang, source = self.resolve(lang, wordlist)
+        with self._connection() as conn:
+            rows = conn.execute(
+                "SELECT word FROM words WHERE lang = ? AND wordlist = ? AND rank < ? "
+                "ORDER BY rank",
+                (lang, source, n),
+            )
+            return [word for (word,) in rows]
+
+    def close(self) -> None:
+        """
+        Close the connections in the pool.
+        """
+        with self._lock:
+            if self._pid == os.getpid():
+                while not self._pool.empty():
+                    self._pool.get().close()
+            self._pool = queue.Queue()
+            self._opened = 0
@@ -2,9 +2,11 @@ from __future__ import annotations
 
 import logging
 import unicodedata
+from functools import lru_cache
 
 import langcodes
 import regex
+from ftfy.chardata import DOUBLE_QUOTE_RE, SINGLE_QUOTE_RE
 from ftfy.fixes import uncurl_quotes
 
 from .language_info import (
@@ -171,6 +173,254 @@ TOKEN_RE_WITH_PUNCTUATION = regex.compile(
 # Just identify punctuation, for cases where the tokenizer is separate
 PUNCT_RE = regex.compile(r"[\p{punct}]+")
 
+# The quotation marks that ftfy's `uncurl_quotes` would straighten
+CURLY_QUOTE_RE = regex.compile(f"{SINGLE_QUOTE_RE.pattern}|{DOUBLE_QUOTE_RE.pattern}")
+
+# Identify text that contains any characters from spaceless scripts, which
+# would need case 1 of TOKEN_RE. None of these characters come before Thai
+# (U+0E01) in Unicode, so text whose highest character is lower than that
+# can't contain them.
+SPACELESS_RE = regex.compile(f"[{SPACELESS_EXPR}]", regex.V1)
+SPACELESS_START = "\N{THAI CHARACTER KO KAI}"
+
+
+@lru_cache(maxsize=None)
+def _make_token_re(
+    spaceless: bool, apostrophes: bool, at_signs: bool, include_punctuation: bool
+) -> regex.Pattern:
+    """
+    Build a version of TOKEN_RE or TOKEN_RE_WITH_PUNCTUATION that leaves out
+    the cases that can't match the text we're about to tokenize.
+
+    Most text is not in a spaceless script and contains no apostrophes or "@"
+    signs, but the full expressions check for them at every token anyway. The
+    cases below are the same cases as in those expressions, with the same
+    numbers; when all the flags are True, the expression matches the same
+    tokens as the full one.
+    """
+    cases = []
+    if spaceless:
+        cases.append("[<SPACELESS>]+")  # Case 1
+    if at_signs:
+        cases.append(r"@s \b")  # Case 2
+    if include_punctuation:
+        cases.append(r"[\p{punct}]+")
+
+    # Case 3
+    case3 = r"(?=[\w\p{So}])"
+    if apostrophes:
+        case3 += r" (?!\w\w?'<VOWEL>)"
+    case3 += r" \X+?"
+    if at_signs:
+        # TOKEN_RE_WITH_PUNCTUATION has always checked for a literal "w" here,
+        # not \w, and we need to match its results.
+        if include_punctuation:
+            case3 += r" (?: @s? (?!w) | \b)"
+        else:
+            case3 += r" (?: @s? (?!\w) | \b)"
+    else:
+        case3 += r" \b"
+    cases.append(case3)
+
+    if apostrophes:
+        cases.append(r"\w\w?'")  # Case 4
+
+    expr = " | ".join(cases)
+    return regex.compile(
+        expr.replace("<SPACELESS>", SPACELESS_EXPR).replace("<VOWEL>", INITIAL_VOWEL_EXPR),
+        regex.V1 | regex.WORD | regex.VERBOSE,
+    )
+
+
+def _select_token_re(
+    text: str, include_punctuation: bool, spaceless: bool | None = None
+) -> regex.Pattern:
+    """
+    Choose the simplest token expression that tokenizes this text the same
+    way as the full expression.
+
+    `spaceless` can be set to True when the language is written in a spaceless
+    script, so that we don't spend time checking for what we know is there.
+    """
+    if spaceless is None:
+        spaceless = (
+            not text.isascii()
+            and max(text) >= SPACELESS_START
+            and SPACELESS_RE.search(text) is not None
+        )
+    return _make_token_re(spaceless, "'" in text, "@" in text, include_punctuation)
+
+
+# A faster path for the most common input: short text written entirely in
+# ASCII, or in the letters of Latin-1. This text is already in NFC and NFKC
+# form, has no marks, curly quotes, or spaceless scripts, and each character is
+# its own grapheme, so we can find the same tokens as TOKEN_RE with a simple
+# scan over the characters, implementing the few rules of Unicode word
+# segmentation that apply to these characters.
+SIMPLE_LATIN_RE = regex.compile(r"[\x00-\x7f\xc0-\xd6\xd8-\xf6\xf8-\xff]*")
+
+# Word-break classes from Unicode Annex #29, for the characters that can
+# appear in simple Latin text. Word characters (\w) come first, so a class
+# number of _EXTEND_NUM_LET or lower means the character is a word character.
+_LETTER, _DIGIT, _EXTEND_NUM_LET, _MID_NUM_LET, _MID_LETTER, _MID_NUM, _OTHER = range(7)
+
+
+def _make_simple_latin_classes() -> dict[str, int]:
+    classes = {}
+    for codept in range(0x100):
+        char = chr(codept)
+        if SIMPLE_LATIN_RE.fullmatch(char):
+            if char.isalpha():
+                classes[char] = _LETTER
+            elif char.isdigit():
+                classes[char] = _DIGIT
+    classes["_"] = _EXTEND_NUM_LET
+    classes["."] = classes["'"] = _MID_NUM_LET
+    classes[":"] = _MID_LETTER
+    classes[","] = classes[";"] = _MID_NUM
+    return classes
+
+
+SIMPLE_LATIN_CLASSES = _make_simple_latin_classes()
+INITIAL_VOWELS = frozenset(INITIAL_VOWEL_EXPR.strip("[]"))
+
+
+def _is_word_break(classes: list[int], pos: int) -> bool:
+    """
+    Determine whether there is a word break before `classes[pos]`, following
+    rules WB5 to WB13b of Unicode Annex #29. The other rules don't involve
+    any simple Latin characters that can be part of a token.
+    """
+    if pos >= len(classes):
+        return True
+    before = classes[pos - 1]
+    after = classes[pos]
+    if before <= _EXTEND_NUM_LET and after <= _EXTEND_NUM_LET:
+        # WB5, WB8 to WB10, WB13a and WB13b
+        return False
+    if before == _LETTER:
+        # WB6: "e.g", "don't"
+        return not (
+            (after == _MID_NUM_LET or after == _MID_LETTER)
+            and pos + 1 < len(classes)
+            and classes[pos + 1] == _LETTER
+        )
+    if before == _DIGIT:
+        # WB12: "3.14", "1,000"
+        return not (
+            (after == _MID_NUM_LET or after == _MID_NUM)
+            and pos + 1 < len(classes)
+            and classes[pos + 1] == _DIGIT
+        )
+    if after == _LETTER:
+        # WB7
+        return not (
+            (before == _MID_NUM_LET or before == _MID_LETTER)
+            and pos >= 2
+            and classes[pos - 2] == _LETTER
+        )
+    if after == _DIGIT:
+        # WB11
+        return not (
+            (before == _MID_NUM_LET or before == _MID_NUM)
+            and pos >= 2
+            and classes[pos - 2] == _DIGIT
+        )
+    return True
+
+
+def _scan_simple_latin_chunk(chunk: str, tokens: list[str]) -> None:
+    """
+    Find the tokens that TOKEN_RE would find in `chunk`, a piece of simple
+    Latin text with no whitespace, and append them to `tokens`. The numbered
+    cases are the ones in TOKEN_RE.
+    """
+    classes = [SIMPLE_LATIN_CLASSES.get(char, _OTHER) for char in chunk]
+    length = len(chunk)
+    pos = 0
+    while pos < length:
+        if classes[pos] <= _EXTEND_NUM_LET:
+            # Case 4 comes before case 3 when the token starts with 1-2 word
+            # characters, an apostrophe, and a vowel
+            if pos + 2 < length and chunk[pos + 1] == "'" and chunk[pos + 2] in INITIAL_VOWELS:
+                tokens.append(chunk[pos])
+                pos += 2
+                continue
+            if (
+                pos + 3 < length
+                and classes[pos + 1] <= _EXTEND_NUM_LET
+                and chunk[pos + 2] == "'"
+                and chunk[pos + 3] in INITIAL_VOWELS
+            ):
+                tokens.append(chunk[pos : pos + 2])
+                pos += 3
+                continue
+
+            # Case 3: continue to the first word break, or through a final
+            # "@" or "@s"
+            end = pos + 1
+            while True:
+                if end < length and chunk[end] == "@":
+                    if (
+                        end + 1 < length
+                        and chunk[end + 1] == "s"
+                        and (end + 2 == length or classes[end + 2] > _EXTEND_NUM_LET)
+                    ):
+                        end += 2
+                        break
+                    if end + 1 == length or classes[end + 1] > _EXTEND_NUM_LET:
+                        end += 1
+                        break
+                if _is_word_break(classes, end):
+                    break
+                end += 1
+            tokens.append(chunk[pos:end])
+            pos = end
+        elif chunk.startswith("@s", pos) and (
+            pos + 2 == length or _is_word_break(classes, pos + 2)
+        ):
+            # Case 2
+            tokens.append("@s")
+            pos += 2
+        else:
+            pos += 1
+
+
+def _is_simple_latin(text: str) -> bool:
+    return text.isascii() or SIMPLE_LATIN_RE.fullmatch(text) is not None
+
+
+def _scan_simple_latin(text: str) -> list[str]:
+    """
+    Tokenize simple Latin text (see SIMPLE_LATIN_RE), getting the same tokens
+    as TOKEN_RE would, with apostrophes stripped from the ends.
+
+    Whitespace always separates tokens, so we can handle one
+    whitespace-separated chunk at a time, and most chunks are entire words.
+    """
+    tokens: list[str] = []
+    for chunk in text.split():
+        if chunk.isalnum():
+            tokens.append(chunk)
+        else:
+            _scan_simple_latin_chunk(chunk, tokens)
+    return tokens
+
+
+def _fast_tokenize(text: str, info: dict, include_punctuation: bool) -> list[str] | None:
+    """
+    Tokenize simple Latin text with `_scan_simple_latin`, if the language and
+    options allow it. Returns None when the text needs the full tokenizer.
+
+    Preprocessing such text only needs to case-fold it, except in languages
+    with a dotted and dotless "i".
+    """
+    if include_punctuation or info["tokenizer"] != "regex" or info["dotless_i"]:
+        return None
+    if not _is_simple_latin(text):
+        return None
+    return _scan_simple_latin(text.casefold())
+
 
 def simple_tokenize(text: str, include_punctuation: bool = False) -> list[str]:
     """
@@ -200,11 +450,47 @@ def simple_tokenize(text: str, include_punctuation: bool = False) -> list[str]:
       tokens that are much too long, but the alternative is that every grapheme
       would end up in its own token, which is worse.
     """
-    text = unicodedata.normalize("NFC", text)
+    return _simple_tokenize(text, include_punctuation)
+
+
+def _simple_tokenize(
+    text: str,
+    include_punctuation: bool = False,
+    spaceless: bool | None = None,
+    preprocessed: bool = False,
+) -> list[str]:
+    """
+    The implementation of `simple_tokenize`, which can be told whether the
+    text is expected to be in a spaceless script (see `_select_token_re`).
+
+    If `preprocessed` is True, the text has already been case-folded by
+    `preprocess_text`, so the tokens only need to be case-folded again if
+    NFC normalization changes the text.
+    """
+    if not include_punctuation and _is_simple_latin(text):
+        tokens = _scan_simple_latin(text)
+        if preprocessed:
+            return tokens
+
+        # Case-fold the tokens, not the text, because "ß" becomes "ss" and can
+        # change whether there's a French-style apostrophe
+        return [token.casefold() for token in tokens]
+
+    if not unicodedata.is_normalized("NFC", text):
+        # Composing characters can undo case-folding: for example, "ǰ"
+        # case-folds to "j" plus a combining caron, which NFC composes again
+        text = unicodedata.normalize("NFC", text)
+        preprocessed = False
+
+    token_re = _select_token_re(text, include_punctuation, spaceless)
     if include_punctuation:
-        return [token.casefold() for token in TOKEN_RE_WITH_PUNCTUATION.findall(text)]
+        tokens = token_re.findall(text)
     else:
-        return [token.strip("'").casefold() for token in TOKEN_RE.findall(text)]
+        tokens = [token.strip("'") for token in token_re.findall(text)]
+
+    if preprocessed:
+        return tokens
+    return [token.casefold() for token in tokens]
 
 
 def tokenize(
@@ -244,12 +530,31 @@ def tokenize(
     together, that probably means you passed in CJK text with the wrong
     language code.
     """
+    return _tokenize(text, lang, include_punctuation, external_wordlist)
+
+
+def _tokenize(
+    text: str,
+    lang: str,
+    include_punctuation: bool = False,
+    external_wordlist: bool = False,
+    simplify_chinese: bool = False,
+) -> list[str]:
+    """
+    The implementation of `tokenize`. If `simplify_chinese` is True, Chinese
+    tokens come out of the Jieba tokenizer already converted to Simplified
+    Chinese, as `lossy_tokenize` needs them.
+    """
     # Use globals to load CJK tokenizers on demand, so that we can still run
     # in environments that lack the CJK dependencies
     global _mecab_tokenize, _jieba_tokenize
 
     language = langcodes.get(lang)
     info = get_language_info(language)
+    fast_tokens = _fast_tokenize(text, info, include_punctuation)
+    if fast_tokens is not None:
+        return fast_tokens
+
     text = preprocess_text(text, language)
 
     if info["tokenizer"] == "mecab":
@@ -268,7 +573,9 @@ def tokenize(
 
         _jieba_tokenize = jieba_tokenize
 
-        tokens = _jieba_tokenize(text, external_wordlist=external_wordlist)
+        tokens = _jieba_tokenize(
+            text, external_wordlist=external_wordlist, simplify=simplify_chinese
+        )
         if not include_punctuation:
             tokens = [token for token in tokens if not PUNCT_RE.match(token)]
     else:
@@ -281,7 +588,10 @@ def tokenize(
                 "have a tokenizer for. The results will be bad.".format(lang, info["script"])
             )
             _WARNED_LANGUAGES.add(lang)
-        tokens = simple_tokenize(text, include_punctuation=include_punctuation)
+        # In languages written in spaceless scripts, expect to need the case
+        # for them; otherwise, simple_tokenize checks the text for it
+        spaceless = True if info["script"] in SPACELESS_SCRIPTS else None
+        tokens = _simple_tokenize(text, include_punctuation, spaceless, preprocessed=True)
 
     return tokens
 
@@ -308,13 +618,72 @@ def lossy_tokenize(
     global _simplify_chinese
 
     info = get_language_info(lang)
-    tokens = tokenize(text, lang, include_punctuation, external_wordlist)
 
+    # Simple Latin text has no curly quotes to straighten
+    fast_tokens = _fast_tokenize(text, info, include_punctuation)
+    if fast_tokens is not None:
+        return fast_tokens
+
+    if info["lookup_transliteration"] == "zh-Hans" and info["tokenizer"] == "jieba":
+        # The Jieba tokenizer works on the simplified text anyway, so it can
+        # give us the simplified tokens directly
+        tokens = _tokenize(
+            text, lang, include_punctuation, external_wordlist, simplify_chinese=True
+        )
+    else:
+        tokens = tokenize(text, lang, include_punctuation, external_wordlist)
+
+        if info["lookup_transliteration"] == "zh-Hans":
+            from wordfreq.chinese import simplify_chinese
+
+            _simplify_chinese = simplify_chinese
+
+            tokens = [_simplify_chinese(token) for token in tokens]
+
+    # Check all the tokens for curly quotes at once, because most text has none
+    if CURLY_QUOTE_RE.search("".join(tokens)):
+        tokens = [uncurl_quotes(token) for token in tokens]
+    return tokens
+
+
+def lossy_normalize(text: str, lang: str) -> str:
+    """
+    Normalize text the way `lossy_tokenize` normalizes its tokens, without
+    splitting it into tokens. This is useful for comparing part of a word,
+    such as a prefix that someone is typing, to the words in a wordlist.
+    """
+    global _simplify_chinese
+
+    language = langcodes.get(lang)
+    info = get_language_info(language)
+    text = preprocess_text(text, language)
     if info["lookup_transliteration"] == "zh-Hans":
         from wordfreq.chinese import simplify_chinese
 
         _simplify_chinese = simplify_chinese
+        text = _simplify_chinese(text)
+    if CURLY_QUOTE_RE.search(text):
+        text = uncurl_quotes(text)
+    return text
 
-        tokens = [_simplify_chinese(token) for token in tokens]
 
-    return [uncurl_quotes(token) for token in tokens]
+def _tokenizer_family(lang: str) -> tuple:
+    """
+    Get a key that's the same for all languages whose text `lossy_tokenize`
+    tokenizes and normalizes in exactly the same way, so that text can be
+    tokenized once for all of them.
+    """
+    language = langcodes.get(lang)
+    info = get_language_info(language)
+    return (
+        info["tokenizer"],
+        # MeCab uses a different dictionary for each language
+        language.language if info["tokenizer"] == "mecab" else None,
+        info["script"] in SPACELESS_SCRIPTS,
+        info["normal_form"],
+        info["remove_marks"],
+        info["dotless_i"],
+        info["diacritics_under"],
+        info["transliteration"],
+        info["lookup_transliteration"],
+    )
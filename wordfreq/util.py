@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import os
 from pathlib import Path
 
 import locate
@@ -13,3 +14,22 @@ def data_path(filename: str | None = None) -> Path:
         return Path(locate.this_dir(), "data")
     else:
         return Path(locate.this_dir(), "data", filename)
+
+
+def cache_path(filename: str | None = None) -> Path:
+    """
+    Get a path in the directory where wordfreq keeps the files it generates,
+    such as combined indexes. This is `$WORDFREQ_CACHE_DIR` if it's set, and
+    otherwise 'wordfreq' in the user's cache directory (`$XDG_CACHE_HOME`, or
+    `~/.cache`).
+    """
+    directory = os.environ.get("WORDFREQ_CACHE_DIR")
+    if directory:
+        path = Path(directory)
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+        path = Path(base, "wordfreq")
+    if filename is None:
+        return path
+    else:
+        return path / filename